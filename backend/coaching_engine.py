@@ -3,13 +3,231 @@ Coaching Engine
 Manages coaching modes, barge-in detection, and AI response generation
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 import asyncio
+import hashlib
 import json
+import re
+import time
+from collections import ChainMap
+from contextlib import asynccontextmanager
 from datetime import datetime
+from functools import lru_cache
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
 
 from gemini_client import GeminiClient
-from session_manager import SessionManager
+from session_manager import SessionManager, confidence_score
+
+# Interview section by question index; anything past the end is "wrapup".
+_INTERVIEW_SECTIONS = (
+    "warmup",
+    "background", "background",
+    "technical", "technical", "technical", "technical",
+    "behavioral", "behavioral",
+)
+
+# Upper bound on memoized interview questions/evaluations kept per engine.
+_INTERVIEW_CACHE_LIMIT = 256
+
+# Shared avatar payloads. Responses alias them under both avatar_intent and
+# avatar_state; treat them as read-only (plain dicts so json.dumps still works).
+_AVATAR_NEUTRAL_LISTENING = {"expression": "neutral", "gesture": "listening"}
+_AVATAR_ENCOURAGING_LISTENING = {"expression": "encouraging", "gesture": "listening"}
+_AVATAR_CONCERNED_IDLE = {"expression": "concerned", "gesture": "idle"}
+_AVATAR_CONCERNED_POINTING = {"expression": "concerned", "gesture": "pointing"}
+_EMPTY_AVATAR: Dict[str, str] = {}
+_MISSING = object()
+
+# Fixed interview setup prompts; copied per use and stamped with a timestamp.
+_INTERVIEW_PROMPTS: Dict[str, Dict[str, Any]] = {
+    key: {
+        "type": "coach_response",
+        "voice_text": voice_text,
+        "visual_content": visual_text,
+        "avatar_intent": _AVATAR_NEUTRAL_LISTENING,
+        "avatar_state": _AVATAR_NEUTRAL_LISTENING,
+        "pedagogical_state": "evaluating",
+    }
+    for key, voice_text, visual_text in (
+        ("role", "What role are you interviewing for?", "Interview setup"),
+        ("job_desc", "Paste job description (optional).", "Interview setup"),
+        ("resume", "Upload resume (optional).", "Interview setup"),
+        ("ready", "Thanks. This will be a 10-minute interview. Ready?", "Say Yes to begin"),
+        ("waiting", "No problem. Tell me when you are ready.", "Waiting"),
+    )
+}
+
+# Fixed public speaking prompts, used the same way as _INTERVIEW_PROMPTS.
+_PUBLIC_SPEAKING_PROMPTS: Dict[str, Dict[str, Any]] = {
+    key: {
+        "type": "coach_response",
+        "voice_text": voice_text,
+        "visual_content": visual_text,
+        "avatar_intent": _AVATAR_ENCOURAGING_LISTENING,
+        "avatar_state": _AVATAR_ENCOURAGING_LISTENING,
+        "pedagogical_state": "evaluating",
+    }
+    for key, voice_text, visual_text in (
+        ("type", "What type of speaking do you want to practice?", "Speaking type selection"),
+        ("topic", "Choose a topic or enter your own.", "Topic selection"),
+        ("script", "Upload a script or outline (optional).", "Optional script upload"),
+        ("ready", "You will speak for about 3 to 5 minutes. Ready?", "Say Yes to begin"),
+        ("waiting", "No problem. Tell me when you are ready.", "Waiting"),
+        ("warmup", "Introduce yourself in 30 seconds.", "Warm-up"),
+        ("continue", "Let us continue.", "Public speaking"),
+    )
+}
+
+# Report analysis text. Score placeholders resolve from the model's "scores"
+# dict first and fall back to the defaults below.
+_PS_ANALYSIS_TEMPLATE = (
+    "Topic: {topic}\n"
+    "Duration: {duration:.1f} minutes\n"
+    "Overall Score: {overall_score} / 100\n"
+    "Level: {level}\n\n"
+    "Skill Breakdown:\n"
+    "- Clarity: {clarity}/10\n"
+    "- Confidence: {confidence}/10\n"
+    "- Structure: {structure}/10\n"
+    "- Pace: {pace}/10\n"
+    "- Engagement: {engagement}/10\n\n"
+    "Voice and Delivery:\n"
+    "- Avg Speaking Speed: {wpm} wpm\n"
+    "- Filler Words: {filler_count}\n"
+    "- Pauses: {pause_count}\n\n"
+    "Strengths:\n- {strength}\n\n"
+    "Improvement Areas:\n- {improvement}\n\n"
+    "Moment-Level Feedback:\n{moment_feedback}\n\n"
+    "Next Steps:\n{next_steps}"
+)
+_PS_SCORE_DEFAULTS = {"clarity": 7, "confidence": 7, "structure": 6, "pace": 7, "engagement": 7}
+
+_INTERVIEW_ANALYSIS_TEMPLATE = (
+    "Overall Level: {overall_level}\n\n"
+    "Scores (1-10):\n"
+    "- Technical: {technical}\n"
+    "- Problem Solving: {problem_solving}\n"
+    "- Communication: {communication}\n\n"
+    "Top Strength: {top_strength}\n"
+    "Top Improvement Area: {top_improvement}\n\n"
+    "Next Steps: {next_steps}"
+)
+_INTERVIEW_SCORE_DEFAULTS = {"technical": 7, "problem_solving": 7, "communication": 7}
+
+# Transcript line prefixes for report prompts; other interaction types are skipped.
+_ROLE_PREFIX = {"user": "User: ", "assistant": "AI: "}
+
+_FOLLOWUP_QUESTIONS = (
+    "Can you summarize your main point in one sentence?",
+    "What is one real-world example that supports your point?",
+    "Who is your target audience?",
+)
+
+_BARGE_IN_MESSAGES = {
+    "filler_words": "Stop. You are using too many filler words. Take a breath and restart your thought clearly.",
+    "stress_spike": "Pause. I can tell you are nervous. Take a moment to collect yourself.",
+    "gaze_away": "Look at me. Maintain eye contact when speaking.",
+    "combined": "Stop. Let us reset. You are showing stress, poor eye contact, and using filler words. Breathe and try again.",
+}
+
+_ZERO_GAZE = (0.0, 0.0, 0.0)
+
+# Whole-word filler matches, so "likely" or "album" no longer count.
+_FILLER_RE = re.compile(r"\b(?:um|uh|like|you\s+know|basically|literally)\b", re.IGNORECASE)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Whitespace other than a lone space: tabs, newlines or runs of spaces.
+_COLLAPSIBLE_WS_RE = re.compile(r"[^\S ]|  ")
+_YES_RE = re.compile(r"\b(?:yes|ready|yep|yeah|ok(?:ay)?|sure|start)\b")
+_SKIP_REPLIES = frozenset({"", "skip", "no", "none", "n/a", "na"})
+# Whole words only: "end" must not match "weekend" or "recommend" mid-speech.
+_DONE_RE = re.compile(r"\b(?:done|thank you|thanks|finished|end)\b")
+
+# Ordered: longer phrases come before the words they contain.
+_SPEAKING_TYPE_ITEMS = (
+    ("interview answer", "Interview answer"),
+    ("interview", "Interview answer"),
+    ("presentation", "Presentation"),
+    ("pitch", "Pitch"),
+    ("storytelling", "Storytelling"),
+    ("story", "Storytelling"),
+    ("casual conversation", "Casual conversation"),
+    ("conversation", "Casual conversation"),
+)
+
+_TECHNICAL_QUESTION_PROMPT = """You are a professional interviewer. Generate ONE technical interview question.
+
+Role: {role}
+Job description (optional): {job_description}
+Resume (optional): {resume}
+Desired difficulty: {difficulty}
+Question pattern: concept OR coding/logic OR applied scenario (rotate, keep concise).
+Hard constraints:
+- Output exactly one question, one sentence, and at most one question mark.
+- Do not include multiple parts, follow-ups, or "and"-joined questions.
+- Avoid asking for full code; prefer reasoning or short snippets.
+- Use simple wording; avoid formulas, math notation, or symbolic expressions unless the user explicitly asked for formulas.
+
+Return ONLY raw JSON:
+{{
+    "question": "<single technical question, one sentence>"
+}}"""
+
+_EVALUATION_PROMPT = """You are a professional interviewer. Evaluate the candidate answer.
+
+Role: {role}
+Section: {section}
+Question: {question}
+Answer: {answer}
+
+    Feedback rules:
+    - Be specific and actionable; avoid vague phrases like "hard to understand".
+    - If the question involves code, algorithms, complexity, or formulas, include a short concrete example or hint.
+    - Keep bullets short (max 12 words each).
+
+Return ONLY raw JSON:
+{{
+  "evaluation": "good" | "partial" | "weak",
+  "strengths": ["short bullet"],
+  "improvements": ["short bullet"],
+  "hint": "short hint for improvement"
+}}"""
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _text_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+
+
+@lru_cache(maxsize=512)
+def _is_yes_reply(lowered: str) -> bool:
+    return _YES_RE.search(lowered) is not None
+
+
+@lru_cache(maxsize=512)
+def _match_speaking_type(lowered: str) -> Optional[str]:
+    for key, value in _SPEAKING_TYPE_ITEMS:
+        if key in lowered:
+            return value
+    return None
+
+
+def _parse_begin_payload(text: str) -> Dict[str, Any]:
+    """Decode the JSON after ``BEGIN_*::``; empty or malformed payloads yield {}."""
+    _, sep, payload_text = text.partition("::")
+    if not sep or not payload_text:
+        return {}
+    try:
+        payload = orjson.loads(payload_text) if orjson is not None else json.loads(payload_text)
+    except ValueError:
+        return {}
+    return payload if isinstance(payload, dict) else {}
 
 
 class CoachingEngine:
@@ -19,9 +237,50 @@ class CoachingEngine:
         self.gemini = gemini_client
         self.session_manager = session_manager
         self.barge_in_detector = BargeInDetector()
+        self._interview_question_cache: Dict[Tuple[Any, ...], str] = {}
+        self._interview_eval_cache: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        # Sessions changed during the current turn; kept off the session dict so it never hits disk.
+        self._dirty_turns: Set[str] = set()
+        self._audio_handlers = {
+            "tutoring": self._tutoring_response,
+            "interview": self._interview_response,
+            "public_speaking": self._public_speaking_response,
+        }
+        self._text_flows = {
+            "interview": self._handle_interview_flow,
+            "public_speaking": self._handle_public_speaking_flow,
+        }
+        # Setup stages; "interview" has no entry and falls through to answer evaluation.
+        self._iv_stage_handlers = {
+            "init": self._iv_stage_init,
+            "role": self._iv_stage_role,
+            "job_desc": self._iv_stage_job_desc,
+            "resume": self._iv_stage_resume,
+            "ready": self._iv_stage_ready,
+        }
+        self._ps_stage_handlers = {
+            "init": self._ps_stage_init,
+            "type": self._ps_stage_type,
+            "topic": self._ps_stage_topic,
+            "script": self._ps_stage_script,
+            "ready": self._ps_stage_ready,
+            "warmup": self._ps_stage_warmup,
+            "main": self._ps_stage_main,
+            "followup": self._ps_stage_followup,
+        }
+
+    def _remember(self, cache: Dict[Tuple[Any, ...], Any], key: Tuple[Any, ...], value: Any) -> None:
+        if len(cache) >= _INTERVIEW_CACHE_LIMIT:
+            cache.pop(next(iter(cache)))
+        cache[key] = value
+
+    @staticmethod
+    def _now_iso() -> str:
+        return datetime.now().isoformat()
 
     def _normalize_avatar_payload(self, payload: Dict[str, Any]) -> Dict[str, str]:
-        raw = payload.get("avatar_intent") or payload.get("avatar_state") or {}
+        get = payload.get
+        raw = get("avatar_intent") or get("avatar_state") or _EMPTY_AVATAR
         return {
             "expression": raw.get("expression", "neutral"),
             "gesture": raw.get("gesture", "idle"),
@@ -30,15 +289,43 @@ class CoachingEngine:
     def _parse_draw_directive(self, text: Any) -> Optional[Dict[str, str]]:
         if not text:
             return None
-        raw = str(text).strip()
+        raw = (text if isinstance(text, str) else str(text)).strip()
         if not raw.startswith("DRAW_"):
             return None
-        parts = raw.split(":", 1)
-        command = parts[0].strip()
-        detail = parts[1].strip() if len(parts) > 1 else ""
-        if not command:
+        # raw is already trimmed, so each half only needs its inner edge stripped.
+        colon = raw.find(":")
+        if colon < 0:
+            return {"command": raw, "detail": ""}
+        return {"command": raw[:colon].rstrip(), "detail": raw[colon + 1:].lstrip()}
+
+    def _resolve_visual(
+        self,
+        response_data: Dict[str, Any],
+        draw_directive: Optional[Dict[str, str]],
+    ) -> Optional[Dict[str, Any]]:
+        """Return the final visual for a step response, or None to leave it as is."""
+        visual = response_data.get("visual", _MISSING)
+        if visual is _MISSING:
+            visual_content = response_data.get("visual_content")
+            if not visual_content:
+                return None
+            if draw_directive:
+                return {"type": "diagram", "content": draw_directive}
+            return {"type": "none", "content": visual_content}
+
+        if not isinstance(visual, dict):
             return None
-        return {"command": command, "detail": detail}
+
+        visual_type = visual.get("type")
+        if visual_type in (None, "none") and draw_directive:
+            return {"type": "diagram", "content": draw_directive}
+        if visual_type == "diagram":
+            content = visual.get("content")
+            if isinstance(content, str):
+                parsed = self._parse_draw_directive(content)
+                if parsed:
+                    visual["content"] = parsed
+        return visual
 
     async def process_audio(self, session_id: str, audio_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process incoming audio data and generate response."""
@@ -61,19 +348,16 @@ class CoachingEngine:
         if should_barge_in:
             return await self._handle_barge_in(session_id, should_barge_in)
 
-        if mode == "tutoring":
-            response = await self._tutoring_response(session_id, transcript, biometric_data)
-        elif mode == "interview":
-            response = await self._interview_response(session_id, transcript)
-        elif mode == "public_speaking":
-            response = await self._public_speaking_response(session_id, transcript)
-        else:
-            response = await self._default_response(session_id, transcript)
+        handler = self._audio_handlers.get(mode, self._default_response)
+        response = await handler(session_id, transcript, biometric_data)
 
-        assistant_text = response.get("voice_text") or response.get("narration") or response.get("text", "")
-        visual_content = response.get("visual_content", "")
-        if not visual_content and isinstance(response.get("visual"), dict):
-            visual_content = response["visual"].get("content") or ""
+        get = response.get
+        assistant_text = get("voice_text") or get("narration") or get("text", "")
+        visual_content = get("visual_content", "")
+        if not visual_content:
+            visual = get("visual")
+            if isinstance(visual, dict):
+                visual_content = visual.get("content") or ""
 
         await self.session_manager.add_interaction(
             session_id,
@@ -81,11 +365,11 @@ class CoachingEngine:
                 "role": "assistant",
                 "content": assistant_text,
                 "visual_content": visual_content,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self._now_iso(),
             },
         )
 
-        if response.get("kind") in {"step", "check_in"} or response.get("type"):
+        if get("kind") in {"step", "check_in"} or get("type"):
             return response
 
         return {"type": "coach_response", **response}
@@ -98,167 +382,175 @@ class CoachingEngine:
 
         mode = session.get("mode", "tutoring")
 
-        if mode == "interview":
-            return await self._handle_interview_flow(session_id, text)
-
-        if mode == "public_speaking":
-            return await self._handle_public_speaking_flow(session_id, text)
-
-        await self.session_manager.add_interaction(
-            session_id,
-            {
-                "role": "user",
-                "content": text,
-                "timestamp": datetime.now().isoformat(),
-            },
-        )
+        flow = self._text_flows.get(mode)
+        if flow:
+            return await flow(session_id, text)
 
-        updated_session = await self.session_manager.get_session(session_id)
-        messages = updated_session.get("context_history", [])
+        user_interaction = {
+            "role": "user",
+            "content": text,
+            "timestamp": self._now_iso(),
+        }
+        # The user turn is recorded together with the reply below; the model
+        # only reads the last 12 messages, so hand it that window directly.
+        messages = session.get("context_history", [])[-11:] + [user_interaction]
 
         session_meta: Dict[str, Any] = {}
         if mode == "tutoring":
             session_meta["current_step"] = int(session.get("tutoring_step", 0))
 
-        response_data = await self.gemini.generate_structured_response(
-            messages,
-            mode,
-            session_meta=session_meta,
-        )
+        if self.gemini.in_cooldown():
+            # The API just rate limited or failed; answer from the error path without a request.
+            response_data = {"type": "error", "message": "Gemini is cooling down after an API error."}
+        else:
+            response_data = await self.gemini.generate_structured_response(
+                messages,
+                mode,
+                session_meta=session_meta,
+            )
+        reply_timestamp = self._now_iso()
+
+        if not isinstance(response_data, dict):
+            response_data = {}
+        get = response_data.get
 
-        if isinstance(response_data, dict) and response_data.get("kind") in {"step", "check_in"}:
+        if get("kind") in {"step", "check_in"}:
             avatar_payload = self._normalize_avatar_payload(response_data)
             response_data["avatar_intent"] = avatar_payload
             response_data["avatar_state"] = avatar_payload
 
-            if response_data.get("kind") == "step":
+            if get("kind") == "step":
                 current_step = int(session.get("tutoring_step", 0))
-                proposed_step = response_data.get("step")
+                proposed_step = get("step")
                 if not isinstance(proposed_step, int) or proposed_step <= current_step:
                     response_data["step"] = current_step + 1
-                session["tutoring_step"] = int(response_data["step"])
+                await self.session_manager.update_session(session_id, {"tutoring_step": int(response_data["step"])})
 
-                if not response_data.get("narration"):
+                if not get("narration"):
                     response_data["narration"] = (
-                        response_data.get("voice_text")
-                        or response_data.get("visual_content", "")
+                        get("voice_text")
+                        or get("visual_content", "")
                     )
-                visual_content = response_data.get("visual_content")
+                visual_content = get("visual_content")
                 draw_directive = self._parse_draw_directive(visual_content)
 
-                if "visual" not in response_data and visual_content:
-                    if draw_directive:
-                        response_data["visual"] = {
-                            "type": "diagram",
-                            "content": draw_directive,
-                        }
-                    else:
-                        response_data["visual"] = {
-                            "type": "none",
-                            "content": visual_content,
-                        }
-
-                if isinstance(response_data.get("visual"), dict):
-                    visual_payload = response_data["visual"]
-                    visual_type = visual_payload.get("type")
-                    if visual_type in (None, "none") and draw_directive:
-                        response_data["visual"] = {
-                            "type": "diagram",
-                            "content": draw_directive,
-                        }
-                    elif visual_type == "diagram":
-                        visual_content_value = visual_payload.get("content")
-                        if isinstance(visual_content_value, str):
-                            parsed = self._parse_draw_directive(visual_content_value)
-                            if parsed:
-                                response_data["visual"]["content"] = parsed
-
-            narration = response_data.get("narration", "")
-            visual_payload = response_data.get("visual")
+                visual = self._resolve_visual(response_data, draw_directive)
+                if visual is not None:
+                    response_data["visual"] = visual
+
+            narration = get("narration", "")
+            visual_payload = get("visual")
             visual_content = ""
             if isinstance(visual_payload, dict):
                 visual_content = visual_payload.get("content") or ""
 
-            await self.session_manager.add_interaction(
+            await self.session_manager.add_interactions(
                 session_id,
-                {
-                    "role": "assistant",
-                    "content": narration,
-                    "visual_content": visual_content,
-                    "timestamp": datetime.now().isoformat(),
-                },
+                [
+                    user_interaction,
+                    {
+                        "role": "assistant",
+                        "content": narration,
+                        "visual_content": visual_content,
+                        "timestamp": reply_timestamp,
+                    },
+                ],
             )
             return response_data
 
-        if isinstance(response_data, dict) and response_data.get("type") == "error":
+        if get("type") == "error":
+            await self.session_manager.add_interactions(session_id, [user_interaction])
             if mode == "tutoring":
-                avatar_payload = {"expression": "concerned", "gesture": "idle"}
                 return {
                     "kind": "step",
                     "step": 1,
                     "subtopic_id": "intro",
                     "narration": "I hit a temporary issue reaching the coaching model. Please restate the topic in one short phrase and I will continue.",
                     "visual": {"type": "none", "content": None},
-                    "avatar_intent": avatar_payload,
-                    "avatar_state": avatar_payload,
-                    "error": response_data.get("visual_content") or response_data.get("message"),
+                    "avatar_intent": _AVATAR_CONCERNED_IDLE,
+                    "avatar_state": _AVATAR_CONCERNED_IDLE,
+                    "error": get("visual_content") or get("message"),
                 }
 
-            avatar_payload = {"expression": "concerned", "gesture": "idle"}
             return {
                 "type": "coach_response",
                 "voice_text": "I hit a temporary issue reaching the coaching model. Please repeat that.",
                 "visual_content": "Temporary connection issue. Try again in a moment.",
-                "avatar_intent": avatar_payload,
-                "avatar_state": avatar_payload,
+                "avatar_intent": _AVATAR_CONCERNED_IDLE,
+                "avatar_state": _AVATAR_CONCERNED_IDLE,
                 "pedagogical_state": "error",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": reply_timestamp,
             }
 
-        if mode == "tutoring" and isinstance(response_data, dict) and response_data.get("kind") is None:
-            session["tutoring_step"] = int(session.get("tutoring_step", 0)) + 1
+        if mode == "tutoring" and get("kind") is None:
+            await self.session_manager.add_interactions(session_id, [user_interaction])
+            await self.session_manager.update_session(
+                session_id, {"tutoring_step": int(session.get("tutoring_step", 0)) + 1}
+            )
             avatar_payload = self._normalize_avatar_payload(response_data)
             return {
                 "kind": "step",
                 "step": session["tutoring_step"],
                 "subtopic_id": "auto",
                 "narration": (
-                    response_data.get("voice_text")
-                    or response_data.get("visual_content", "")
+                    get("voice_text")
+                    or get("visual_content", "")
                     or "Let us begin with the core idea."
                 ),
-                "visual": {"type": "none", "content": response_data.get("visual_content")},
+                "visual": {"type": "none", "content": get("visual_content")},
                 "avatar_intent": avatar_payload,
                 "avatar_state": avatar_payload,
-                "pedagogical_state": response_data.get("pedagogical_state", "explaining"),
+                "pedagogical_state": get("pedagogical_state", "explaining"),
             }
 
         avatar_payload = self._normalize_avatar_payload(response_data)
-        await self.session_manager.add_interaction(
+        await self.session_manager.add_interactions(
             session_id,
-            {
-                "role": "assistant",
-                "content": response_data.get("voice_text", ""),
-                "visual_content": response_data.get("visual_content", ""),
-                "timestamp": datetime.now().isoformat(),
-            },
+            [
+                user_interaction,
+                {
+                    "role": "assistant",
+                    "content": get("voice_text", ""),
+                    "visual_content": get("visual_content", ""),
+                    "timestamp": reply_timestamp,
+                },
+            ],
         )
 
         return {
             "type": "coach_response",
-            "voice_text": response_data.get("voice_text", ""),
-            "visual_content": response_data.get("visual_content", ""),
+            "voice_text": get("voice_text", ""),
+            "visual_content": get("visual_content", ""),
             "avatar_intent": avatar_payload,
             "avatar_state": avatar_payload,
-            "pedagogical_state": response_data.get("pedagogical_state", "explaining"),
-            "timestamp": datetime.now().isoformat(),
+            "pedagogical_state": get("pedagogical_state", "explaining"),
+            "timestamp": reply_timestamp,
         }
 
-    async def _handle_interview_flow(self, session_id: str, text: str) -> Dict[str, Any]:
+    @asynccontextmanager
+    async def _session_autosave(self, session_id: str) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield the session and queue it for saving on exit if a handler called _mark_turn_dirty."""
         session = await self.session_manager.get_session(session_id)
-        if not session:
-            return {"type": "error", "message": f"Session {session_id} not found"}
+        try:
+            yield session
+        finally:
+            # Also on error: whatever the handler already changed is in memory, and
+            # the next snapshot writes it regardless.
+            if session_id in self._dirty_turns:
+                self._dirty_turns.discard(session_id)
+                if session:
+                    self.session_manager.mark_dirty(session_id)
+
+    def _mark_turn_dirty(self, session: Dict[str, Any]) -> None:
+        self._dirty_turns.add(session["session_id"])
+
+    async def _handle_interview_flow(self, session_id: str, text: str) -> Dict[str, Any]:
+        async with self._session_autosave(session_id) as session:
+            if not session:
+                return {"type": "error", "message": f"Session {session_id} not found"}
+            return await self._interview_turn(session_id, session, text)
 
+    async def _interview_turn(self, session_id: str, session: Dict[str, Any], text: str) -> Dict[str, Any]:
         state = session.get("interview_state") or {}
         if not state:
             state = {
@@ -268,6 +560,7 @@ class CoachingEngine:
                 "resume": "",
                 "started": False,
                 "start_time": None,
+                "start_epoch": None,
                 "question_count": 0,
                 "max_questions": 10,
                 "min_questions": 6,
@@ -277,19 +570,15 @@ class CoachingEngine:
                 "current_section": "",
                 "hint_used": False,
                 "last_question_time": None,
+                "last_question_epoch": None,
             }
 
         normalized_text = (text or "").strip()
         lower_text = normalized_text.lower()
+        timestamp = self._now_iso()
 
         if normalized_text.startswith("BEGIN_INTERVIEW"):
-            payload_text = normalized_text.split("::", 1)[1] if "::" in normalized_text else ""
-            payload = {}
-            if payload_text:
-                try:
-                    payload = json.loads(payload_text)
-                except Exception:
-                    payload = {}
+            payload = _parse_begin_payload(normalized_text)
 
             state["job_description"] = payload.get("job_description", "")
             state["resume"] = payload.get("resume", "")
@@ -298,120 +587,154 @@ class CoachingEngine:
             if not state.get("job_description"):
                 state["stage"] = "job_desc"
                 session["interview_state"] = state
-                await self.session_manager._save_session(session_id)
-                return self._interview_prompt(
-                    "Paste job description (optional).",
-                    "Interview setup",
-                )
+                self._mark_turn_dirty(session)
+                return self._interview_prompt_for("job_desc")
 
             state["stage"] = "ready"
             session["interview_state"] = state
-            await self.session_manager._save_session(session_id)
-            return self._interview_prompt(
-                "Thanks. This will be a 10-minute interview. Ready?",
-                "Say Yes to begin",
-            )
+            self._mark_turn_dirty(session)
+            return self._interview_prompt_for("ready")
 
         if lower_text == "end":
             await self.session_manager.end_session(session_id)
             report = await self.generate_vibe_report(session_id)
             return {"type": "session_ended", "report": report}
 
-        await self.session_manager.add_interaction(
+        await self.session_manager.add_interactions(
             session_id,
-            {
-                "role": "user",
-                "content": normalized_text,
-                "timestamp": datetime.now().isoformat(),
-            },
+            [{"role": "user", "content": normalized_text, "timestamp": timestamp}],
         )
+        self._mark_turn_dirty(session)
 
-        if state.get("stage") == "init":
-            state["stage"] = "role"
-            session["interview_state"] = state
-            await self.session_manager._save_session(session_id)
-            return self._interview_prompt(
-                "What role are you interviewing for?",
-                "Interview setup",
-            )
-
-        if state.get("stage") == "role":
-            state["role"] = normalized_text
-            state["stage"] = "job_desc"
-            session["interview_state"] = state
-            await self.session_manager._save_session(session_id)
-            return self._interview_prompt(
-                "Paste job description (optional).",
-                "Interview setup",
-            )
-
-        if state.get("stage") == "job_desc":
-            if not self._is_skip(lower_text):
-                state["job_description"] = normalized_text
-            state["stage"] = "resume"
-            session["interview_state"] = state
-            await self.session_manager._save_session(session_id)
-            return self._interview_prompt(
-                "Upload resume (optional).",
-                "Interview setup",
-            )
-
-        if state.get("stage") == "resume":
-            if not self._is_skip(lower_text):
-                state["resume"] = normalized_text
-            state["stage"] = "ready"
-            session["interview_state"] = state
-            await self.session_manager._save_session(session_id)
-            return self._interview_prompt(
-                "Thanks. This will be a 10-minute interview. Ready?",
-                "Say Yes to begin",
-            )
-
-        if state.get("stage") == "ready":
-            if not self._is_yes(lower_text):
-                return self._interview_prompt(
-                    "No problem. Tell me when you are ready.",
-                    "Waiting",
-                )
-
-            state["stage"] = "interview"
-            state["started"] = True
-            state["start_time"] = datetime.now().isoformat()
-            session["interview_state"] = state
-            await self.session_manager._save_session(session_id)
-            return await self._ask_next_interview_question(session_id, state, feedback=None)
+        stage_handler = self._iv_stage_handlers.get(state.get("stage"))
+        if stage_handler:
+            return await stage_handler(session_id, state, session, normalized_text, lower_text, timestamp)
 
         if self._should_end_interview(state):
             await self.session_manager.end_session(session_id)
             report = await self.generate_vibe_report(session_id)
             return {"type": "session_ended", "report": report}
 
-        # Evaluate answer and decide next step
-        evaluation = await self._evaluate_interview_answer(state, normalized_text)
-
         if state.get("current_section") == "technical":
-            if state.get("last_question_time"):
-                elapsed = (datetime.now() - datetime.fromisoformat(state["last_question_time"]))
-                if elapsed.total_seconds() > 90:
-                    state["hint_used"] = True
-                    session["interview_state"] = state
-                    await self.session_manager._save_session(session_id)
-                    feedback = "Let us move to the next question."
-                    return await self._ask_next_interview_question(session_id, state, feedback=feedback)
-
-            if evaluation.get("evaluation") == "weak" and not state.get("hint_used"):
+            elapsed = self._seconds_since(state, "last_question_epoch", "last_question_time")
+            if elapsed is not None and elapsed > 90:
+                state["hint_used"] = True
+                session["interview_state"] = state
+                self._mark_turn_dirty(session)
+                feedback = "Let us move to the next question."
+                return await self._ask_next_interview_question(session_id, session, state, feedback=feedback)
+
+        next_index = int(state.get("question_count", 0))
+        section = self._section_for_question(next_index)
+
+        if state.get("current_section") == "technical" and not state.get("hint_used"):
+            # A weak technical answer earns a hint instead of a new question,
+            # so the evaluation has to land before we generate anything else.
+            evaluation = await self._evaluate_interview_answer(state, normalized_text)
+            if evaluation.get("evaluation") == "weak":
                 state["hint_used"] = True
                 session["interview_state"] = state
-                await self.session_manager._save_session(session_id)
+                self._mark_turn_dirty(session)
                 hint = evaluation.get("hint") or "Hint: Consider time complexity and fast lookup."
                 return self._interview_prompt(hint, "Hint")
+            question = await self._generate_interview_question(state, section, next_index)
+        else:
+            # Evaluation and the next question are independent model calls here.
+            evaluation, question = await asyncio.gather(
+                self._evaluate_interview_answer(state, normalized_text),
+                self._generate_interview_question(state, section, next_index),
+            )
 
         feedback = self._format_feedback(evaluation)
-        return await self._ask_next_interview_question(session_id, state, feedback=feedback)
+        return self._advance_interview_question(
+            session, state, section, next_index, question, feedback=feedback
+        )
+
+    async def _iv_stage_init(
+        self,
+        session_id: str,
+        state: Dict[str, Any],
+        session: Dict[str, Any],
+        normalized_text: str,
+        lower_text: str,
+        timestamp: str,
+    ) -> Dict[str, Any]:
+        state["stage"] = "role"
+        session["interview_state"] = state
+        self._mark_turn_dirty(session)
+        return self._interview_prompt_for("role")
+
+    async def _iv_stage_role(
+        self,
+        session_id: str,
+        state: Dict[str, Any],
+        session: Dict[str, Any],
+        normalized_text: str,
+        lower_text: str,
+        timestamp: str,
+    ) -> Dict[str, Any]:
+        state["role"] = normalized_text
+        state["stage"] = "job_desc"
+        session["interview_state"] = state
+        self._mark_turn_dirty(session)
+        return self._interview_prompt_for("job_desc")
+
+    async def _iv_stage_job_desc(
+        self,
+        session_id: str,
+        state: Dict[str, Any],
+        session: Dict[str, Any],
+        normalized_text: str,
+        lower_text: str,
+        timestamp: str,
+    ) -> Dict[str, Any]:
+        if not self._is_skip(lower_text):
+            state["job_description"] = normalized_text
+        state["stage"] = "resume"
+        session["interview_state"] = state
+        self._mark_turn_dirty(session)
+        return self._interview_prompt_for("resume")
+
+    async def _iv_stage_resume(
+        self,
+        session_id: str,
+        state: Dict[str, Any],
+        session: Dict[str, Any],
+        normalized_text: str,
+        lower_text: str,
+        timestamp: str,
+    ) -> Dict[str, Any]:
+        if not self._is_skip(lower_text):
+            state["resume"] = normalized_text
+        state["stage"] = "ready"
+        session["interview_state"] = state
+        self._mark_turn_dirty(session)
+        return self._interview_prompt_for("ready")
+
+    async def _iv_stage_ready(
+        self,
+        session_id: str,
+        state: Dict[str, Any],
+        session: Dict[str, Any],
+        normalized_text: str,
+        lower_text: str,
+        timestamp: str,
+    ) -> Dict[str, Any]:
+        if not self._is_yes(lower_text):
+            return self._interview_prompt_for("waiting")
+
+        state["stage"] = "interview"
+        state["started"] = True
+        state["start_time"] = timestamp
+        state["start_epoch"] = time.time()
+        session["interview_state"] = state
+        self._mark_turn_dirty(session)
+        return await self._ask_next_interview_question(session_id, session, state, feedback=None)
 
     async def _ask_next_interview_question(
         self,
         session_id: str,
+        session: Dict[str, Any],
         state: Dict[str, Any],
         feedback: Optional[str],
     ) -> Dict[str, Any]:
@@ -423,38 +746,44 @@ class CoachingEngine:
         next_index = int(state.get("question_count", 0))
         section = self._section_for_question(next_index)
         question = await self._generate_interview_question(state, section, next_index)
+        return self._advance_interview_question(
+            session, state, section, next_index, question, feedback=feedback
+        )
 
+    def _advance_interview_question(
+        self,
+        session: Dict[str, Any],
+        state: Dict[str, Any],
+        section: str,
+        next_index: int,
+        question: str,
+        feedback: Optional[str],
+    ) -> Dict[str, Any]:
+        timestamp = self._now_iso()
         state["question_count"] = next_index + 1
         state["current_section"] = section
         state["current_question"] = question
         state["hint_used"] = False
-        state["last_question_time"] = datetime.now().isoformat()
+        state["last_question_time"] = timestamp
+        state["last_question_epoch"] = time.time()
 
-        session = await self.session_manager.get_session(session_id)
-        if session:
-            session["interview_state"] = state
-            await self.session_manager._save_session(session_id)
+        session["interview_state"] = state
+        self._mark_turn_dirty(session)
 
         visual = feedback or "Interview in progress."
         return {
             "type": "coach_response",
             "voice_text": question,
             "visual_content": visual,
-            "avatar_intent": {"expression": "neutral", "gesture": "listening"},
+            "avatar_intent": _AVATAR_NEUTRAL_LISTENING,
             "pedagogical_state": "evaluating",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
         }
 
     def _section_for_question(self, index: int) -> str:
-        if index < 1:
-            return "warmup"
-        if index < 3:
-            return "background"
-        if index < 7:
-            return "technical"
-        if index < 9:
-            return "behavioral"
-        return "wrapup"
+        if index >= len(_INTERVIEW_SECTIONS):
+            return "wrapup"
+        return _INTERVIEW_SECTIONS[max(index, 0)]
 
     async def _generate_interview_question(self, state: Dict[str, Any], section: str, index: int) -> str:
         role = state.get("role") or "the role"
@@ -477,80 +806,61 @@ class CoachingEngine:
         if section == "wrapup":
             return "What questions do you have for me about the role?"
 
-        difficulty = "same"
-        prompt = f"""You are a professional interviewer. Generate ONE technical interview question.
+        cache_key = (role, _text_digest(job_description), _text_digest(resume), index, section)
+        cached = self._interview_question_cache.get(cache_key)
+        if cached:
+            return cached
 
-Role: {role}
-Job description (optional): {job_description}
-Resume (optional): {resume}
-Desired difficulty: {difficulty}
-Question pattern: concept OR coding/logic OR applied scenario (rotate, keep concise).
-Hard constraints:
-- Output exactly one question, one sentence, and at most one question mark.
-- Do not include multiple parts, follow-ups, or "and"-joined questions.
-- Avoid asking for full code; prefer reasoning or short snippets.
-- Use simple wording; avoid formulas, math notation, or symbolic expressions unless the user explicitly asked for formulas.
-
-Return ONLY raw JSON:
-{{
-    "question": "<single technical question, one sentence>"
-}}"""
+        prompt = _TECHNICAL_QUESTION_PROMPT.format_map(
+            {"role": role, "job_description": job_description, "resume": resume, "difficulty": "same"}
+        )
 
-        response = await self.gemini.generate_json_response(prompt, mode="interview", thinking_level="low")
-        if isinstance(response, dict) and response.get("question"):
-            return self._normalize_interview_question(response["question"])
+        # The question is the only field we need, so stop reading once it has streamed in.
+        raw_question = await self.gemini.generate_json_field(prompt, "question", thinking_level="low")
+        if raw_question:
+            question = self._normalize_interview_question(raw_question)
+            self._remember(self._interview_question_cache, cache_key, question)
+            return question
 
         return self._normalize_interview_question(
             "What data structure would you use to check if a value has appeared before in a list, and why?"
         )
 
     def _normalize_interview_question(self, question: str) -> str:
-        normalized = " ".join(str(question or "").strip().split())
+        normalized = _WHITESPACE_RE.sub(" ", str(question or "")).strip()
         if not normalized:
             return "Tell me about a project you worked on recently."
 
-        if "?" in normalized:
-            first = normalized.split("?", 1)[0].strip()
-            if first:
-                return f"{first}?"
-            return normalized
-
-        for divider in (". ", "\n", "; "):
-            if divider in normalized:
-                first = normalized.split(divider, 1)[0].strip()
-                if first:
-                    return f"{first}?"
-                break
+        # Whitespace is already collapsed, so only ". " and "; " can still
+        # split sentences; "?" wins, then ". " before "; ".
+        cut = normalized.find("?")
+        if cut >= 0:
+            first = normalized[:cut].strip()
+            return f"{first}?" if first else normalized
 
-        return f"{normalized}?" if not normalized.endswith("?") else normalized
+        cut = normalized.find(". ")
+        if cut < 0:
+            cut = normalized.find("; ")
+        first = normalized[:cut].strip() if cut > 0 else ""
+        return f"{first}?" if first else f"{normalized}?"
 
     async def _evaluate_interview_answer(self, state: Dict[str, Any], answer: str) -> Dict[str, Any]:
         role = state.get("role") or "the role"
         section = state.get("current_section") or "technical"
         question = state.get("current_question") or ""
 
-        prompt = f"""You are a professional interviewer. Evaluate the candidate answer.
-
-Role: {role}
-Section: {section}
-Question: {question}
-Answer: {answer}
-
-    Feedback rules:
-    - Be specific and actionable; avoid vague phrases like "hard to understand".
-    - If the question involves code, algorithms, complexity, or formulas, include a short concrete example or hint.
-    - Keep bullets short (max 12 words each).
+        cache_key = (role, section, question, _text_digest(answer))
+        cached = self._interview_eval_cache.get(cache_key)
+        if cached:
+            return cached
 
-Return ONLY raw JSON:
-{{
-  "evaluation": "good" | "partial" | "weak",
-  "strengths": ["short bullet"],
-  "improvements": ["short bullet"],
-  "hint": "short hint for improvement"
-}}"""
+        prompt = _EVALUATION_PROMPT.format_map(
+            {"role": role, "section": section, "question": question, "answer": answer}
+        )
 
         response = await self.gemini.generate_json_response(prompt, mode="interview", thinking_level="low")
         if isinstance(response, dict) and response.get("evaluation"):
+            self._remember(self._interview_eval_cache, cache_key, response)
             return response
 
         if len(answer) < 30:
@@ -581,37 +891,55 @@ Return ONLY raw JSON:
         if int(state.get("question_count", 0)) >= int(state.get("max_questions", 10)):
             return True
 
-        start_time = state.get("start_time")
-        if start_time:
-            elapsed = datetime.now() - datetime.fromisoformat(start_time)
-            if elapsed.total_seconds() >= int(state.get("max_minutes", 15)) * 60:
-                return True
+        elapsed = self._seconds_since(state, "start_epoch", "start_time")
+        if elapsed is not None and elapsed >= int(state.get("max_minutes", 15)) * 60:
+            return True
 
         return False
 
+    def _seconds_since(self, state: Dict[str, Any], epoch_key: str, iso_key: str) -> Optional[float]:
+        epoch = state.get(epoch_key)
+        if epoch is not None:
+            return time.time() - epoch
+
+        # Sessions saved before epoch fields existed only carry the ISO string.
+        iso_value = state.get(iso_key)
+        if not iso_value:
+            return None
+        try:
+            return (datetime.now() - datetime.fromisoformat(iso_value)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+
     def _is_yes(self, text: str) -> bool:
-        return any(token in text for token in ["yes", "ready", "yep", "yeah", "ok", "okay", "sure", "start"])
+        return _is_yes_reply(text)
 
     def _is_skip(self, text: str) -> bool:
-        return text in {"", "skip", "no", "none", "n/a", "na"}
+        return text in _SKIP_REPLIES
+
+    def _interview_prompt_for(self, key: str) -> Dict[str, Any]:
+        response = _INTERVIEW_PROMPTS[key].copy()
+        response["timestamp"] = self._now_iso()
+        return response
 
     def _interview_prompt(self, voice_text: str, visual_text: str) -> Dict[str, Any]:
-        avatar_payload = {"expression": "neutral", "gesture": "listening"}
         return {
             "type": "coach_response",
             "voice_text": voice_text,
             "visual_content": visual_text,
-            "avatar_intent": avatar_payload,
-            "avatar_state": avatar_payload,
+            "avatar_intent": _AVATAR_NEUTRAL_LISTENING,
+            "avatar_state": _AVATAR_NEUTRAL_LISTENING,
             "pedagogical_state": "evaluating",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._now_iso(),
         }
 
     async def _handle_public_speaking_flow(self, session_id: str, text: str) -> Dict[str, Any]:
-        session = await self.session_manager.get_session(session_id)
-        if not session:
-            return {"type": "error", "message": f"Session {session_id} not found"}
+        async with self._session_autosave(session_id) as session:
+            if not session:
+                return {"type": "error", "message": f"Session {session_id} not found"}
+            return await self._public_speaking_turn(session_id, session, text)
 
+    async def _public_speaking_turn(self, session_id: str, session: Dict[str, Any], text: str) -> Dict[str, Any]:
         state = session.get("public_speaking_state") or {}
         if not state:
             state = {
@@ -621,7 +949,9 @@ Return ONLY raw JSON:
                 "script": "",
                 "started": False,
                 "start_time": None,
+                "start_epoch": None,
                 "main_speech_start": None,
+                "main_speech_start_epoch": None,
                 "followup_index": 0,
                 "followup_total": 3,
                 "word_count": 0,
@@ -632,15 +962,10 @@ Return ONLY raw JSON:
 
         normalized_text = (text or "").strip()
         lower_text = normalized_text.lower()
+        timestamp = self._now_iso()
 
         if normalized_text.startswith("BEGIN_PUBLIC_SPEAKING"):
-            payload_text = normalized_text.split("::", 1)[1] if "::" in normalized_text else ""
-            payload = {}
-            if payload_text:
-                try:
-                    payload = json.loads(payload_text)
-                except Exception:
-                    payload = {}
+            payload = _parse_begin_payload(normalized_text)
 
             state["speaking_type"] = payload.get("speaking_type", "")
             state["topic"] = payload.get("topic", "")
@@ -649,252 +974,282 @@ Return ONLY raw JSON:
             if not state.get("speaking_type"):
                 state["stage"] = "type"
                 session["public_speaking_state"] = state
-                await self.session_manager._save_session(session_id)
-                return self._public_speaking_prompt(
-                    "What type of speaking do you want to practice?",
-                    "Speaking type selection",
-                )
+                self._mark_turn_dirty(session)
+                return self._public_speaking_prompt_for("type")
 
             if not state.get("topic"):
                 state["stage"] = "topic"
                 session["public_speaking_state"] = state
-                await self.session_manager._save_session(session_id)
-                return self._public_speaking_prompt(
-                    "Choose a topic or enter your own.",
-                    "Topic selection",
-                )
+                self._mark_turn_dirty(session)
+                return self._public_speaking_prompt_for("topic")
 
             # Script is optional, so if we have type and topic, we go to ready
             state["stage"] = "ready"
             session["public_speaking_state"] = state
-            await self.session_manager._save_session(session_id)
-            return self._public_speaking_prompt(
-                "You will speak for about 3 to 5 minutes. Ready?",
-                "Say Yes to begin",
-            )
+            self._mark_turn_dirty(session)
+            return self._public_speaking_prompt_for("ready")
 
         if self._is_public_speaking_done(lower_text):
             await self.session_manager.end_session(session_id)
             report = await self.generate_vibe_report(session_id)
             return {"type": "session_ended", "report": report}
 
-        if state.get("start_time"):
-            try:
-                elapsed = datetime.now() - datetime.fromisoformat(state["start_time"])
-                if elapsed.total_seconds() >= 15 * 60:
-                    await self.session_manager.end_session(session_id)
-                    report = await self.generate_vibe_report(session_id)
-                    return {"type": "session_ended", "report": report}
-            except Exception:
-                pass
+        elapsed = self._seconds_since(state, "start_epoch", "start_time")
+        if elapsed is not None and elapsed >= 15 * 60:
+            await self.session_manager.end_session(session_id)
+            report = await self.generate_vibe_report(session_id)
+            return {"type": "session_ended", "report": report}
 
-        await self.session_manager.add_interaction(
+        await self.session_manager.add_interactions(
             session_id,
-            {
-                "role": "user",
-                "content": normalized_text,
-                "timestamp": datetime.now().isoformat(),
-            },
+            [{"role": "user", "content": normalized_text, "timestamp": timestamp}],
         )
+        self._mark_turn_dirty(session)
 
-        if state.get("stage") == "init":
-            state["stage"] = "type"
-            session["public_speaking_state"] = state
-            await self.session_manager._save_session(session_id)
-            return self._public_speaking_prompt(
-                "What type of speaking do you want to practice?",
-                "Speaking type selection",
-            )
-
-        if state.get("stage") == "type":
-            matched_type = self._normalize_speaking_type(normalized_text)
-            if matched_type:
-                state["speaking_type"] = matched_type
-                if state.get("topic"):
-                    state["stage"] = "script"
-                    session["public_speaking_state"] = state
-                    await self.session_manager._save_session(session_id)
-                    return self._public_speaking_prompt(
-                        "Upload a script or outline (optional).",
-                        "Optional script upload",
-                    )
-
-                state["stage"] = "topic"
-                session["public_speaking_state"] = state
-                await self.session_manager._save_session(session_id)
-                return self._public_speaking_prompt(
-                    "Choose a topic or enter your own.",
-                    "Topic selection",
-                )
-
-            # If the user answered with a topic, accept it and move on.
-            if not state.get("topic"):
-                state["topic"] = normalized_text
-            state["speaking_type"] = state.get("speaking_type") or "Presentation"
-            state["stage"] = "script"
-            session["public_speaking_state"] = state
-            await self.session_manager._save_session(session_id)
-            return self._public_speaking_prompt(
-                "Upload a script or outline (optional).",
-                "Optional script upload",
-            )
-
-        if state.get("stage") == "topic":
-            if not self._is_skip(lower_text):
-                state["topic"] = normalized_text
-            if not state.get("topic"):
-                return self._public_speaking_prompt(
-                    "Choose a topic or enter your own.",
-                    "Topic selection",
-                )
-            # Script is optional, so move to ready
-            state["stage"] = "ready"
-            session["public_speaking_state"] = state
-            await self.session_manager._save_session(session_id)
-            return self._public_speaking_prompt(
-                "You will speak for about 3 to 5 minutes. Ready?",
-                "Say Yes to begin",
-            )
-
-        if state.get("stage") == "script":
-            if not self._is_skip(lower_text):
-                state["script"] = normalized_text
-            state["stage"] = "ready"
-            session["public_speaking_state"] = state
-            await self.session_manager._save_session(session_id)
-            return self._public_speaking_prompt(
-                "You will speak for about 3 to 5 minutes. Ready?",
-                "Say Yes to begin",
-            )
+        stage_handler = self._ps_stage_handlers.get(state.get("stage"))
+        if stage_handler:
+            return await stage_handler(session_id, state, session, normalized_text, lower_text, timestamp)
 
-        if state.get("stage") == "ready":
-            if not self._is_yes(lower_text):
-                return self._public_speaking_prompt(
-                    "No problem. Tell me when you are ready.",
-                    "Waiting",
-                )
+        return self._public_speaking_prompt_for("continue")
 
-            state["stage"] = "warmup"
-            state["started"] = True
-            state["start_time"] = datetime.now().isoformat()
-            session["public_speaking_state"] = state
-            await self.session_manager._save_session(session_id)
-            return self._public_speaking_prompt(
-                "Introduce yourself in 30 seconds.",
-                "Warm-up",
-            )
+    async def _ps_stage_init(
+        self,
+        session_id: str,
+        state: Dict[str, Any],
+        session: Dict[str, Any],
+        normalized_text: str,
+        lower_text: str,
+        timestamp: str,
+    ) -> Dict[str, Any]:
+        state["stage"] = "type"
+        session["public_speaking_state"] = state
+        self._mark_turn_dirty(session)
+        return self._public_speaking_prompt_for("type")
 
-        if state.get("stage") == "warmup":
-            state["stage"] = "main"
-            state["main_speech_start"] = datetime.now().isoformat()
-            session["public_speaking_state"] = state
-            await self.session_manager._save_session(session_id)
-            return self._public_speaking_prompt(
-                f"Speak about {state.get('topic') or 'your topic'} for 3 minutes.",
-                "Main speech",
-            )
+    async def _ps_stage_type(
+        self,
+        session_id: str,
+        state: Dict[str, Any],
+        session: Dict[str, Any],
+        normalized_text: str,
+        lower_text: str,
+        timestamp: str,
+    ) -> Dict[str, Any]:
+        matched_type = self._normalize_speaking_type(lower_text)
+        if matched_type:
+            state["speaking_type"] = matched_type
+            if state.get("topic"):
+                state["stage"] = "script"
+                session["public_speaking_state"] = state
+                self._mark_turn_dirty(session)
+                return self._public_speaking_prompt_for("script")
 
-        if state.get("stage") == "main":
-            self._update_public_speaking_metrics(state, normalized_text)
-            state["stage"] = "followup"
-            state["followup_index"] = 0
+            state["stage"] = "topic"
             session["public_speaking_state"] = state
-            await self.session_manager._save_session(session_id)
-            return self._public_speaking_prompt(
-                self._followup_question(0),
-                "Follow-up 1 of 3",
-            )
+            self._mark_turn_dirty(session)
+            return self._public_speaking_prompt_for("topic")
+
+        # If the user answered with a topic, accept it and move on.
+        if not state.get("topic"):
+            state["topic"] = normalized_text
+        state["speaking_type"] = state.get("speaking_type") or "Presentation"
+        state["stage"] = "script"
+        session["public_speaking_state"] = state
+        self._mark_turn_dirty(session)
+        return self._public_speaking_prompt_for("script")
+
+    async def _ps_stage_topic(
+        self,
+        session_id: str,
+        state: Dict[str, Any],
+        session: Dict[str, Any],
+        normalized_text: str,
+        lower_text: str,
+        timestamp: str,
+    ) -> Dict[str, Any]:
+        if not self._is_skip(lower_text):
+            state["topic"] = normalized_text
+        if not state.get("topic"):
+            return self._public_speaking_prompt_for("topic")
+        # Script is optional, so move to ready
+        state["stage"] = "ready"
+        session["public_speaking_state"] = state
+        self._mark_turn_dirty(session)
+        return self._public_speaking_prompt_for("ready")
+
+    async def _ps_stage_script(
+        self,
+        session_id: str,
+        state: Dict[str, Any],
+        session: Dict[str, Any],
+        normalized_text: str,
+        lower_text: str,
+        timestamp: str,
+    ) -> Dict[str, Any]:
+        if not self._is_skip(lower_text):
+            state["script"] = normalized_text
+        state["stage"] = "ready"
+        session["public_speaking_state"] = state
+        self._mark_turn_dirty(session)
+        return self._public_speaking_prompt_for("ready")
+
+    async def _ps_stage_ready(
+        self,
+        session_id: str,
+        state: Dict[str, Any],
+        session: Dict[str, Any],
+        normalized_text: str,
+        lower_text: str,
+        timestamp: str,
+    ) -> Dict[str, Any]:
+        if not self._is_yes(lower_text):
+            return self._public_speaking_prompt_for("waiting")
+
+        state["stage"] = "warmup"
+        state["started"] = True
+        state["start_time"] = timestamp
+        state["start_epoch"] = time.time()
+        session["public_speaking_state"] = state
+        self._mark_turn_dirty(session)
+        return self._public_speaking_prompt_for("warmup")
+
+    async def _ps_stage_warmup(
+        self,
+        session_id: str,
+        state: Dict[str, Any],
+        session: Dict[str, Any],
+        normalized_text: str,
+        lower_text: str,
+        timestamp: str,
+    ) -> Dict[str, Any]:
+        state["stage"] = "main"
+        state["main_speech_start"] = timestamp
+        state["main_speech_start_epoch"] = time.time()
+        # Metrics below update these counters in place from here on.
+        for counter in ("word_count", "filler_count", "pause_count"):
+            state.setdefault(counter, 0)
+        session["public_speaking_state"] = state
+        self._mark_turn_dirty(session)
+        return self._public_speaking_prompt(
+            f"Speak about {state.get('topic') or 'your topic'} for 3 minutes.",
+            "Main speech",
+        )
 
-        if state.get("stage") == "followup":
-            self._update_public_speaking_metrics(state, normalized_text)
-            next_index = int(state.get("followup_index", 0)) + 1
-            if next_index >= int(state.get("followup_total", 3)):
-                await self.session_manager.end_session(session_id)
-                report = await self.generate_vibe_report(session_id)
-                return {"type": "session_ended", "report": report}
+    async def _ps_stage_main(
+        self,
+        session_id: str,
+        state: Dict[str, Any],
+        session: Dict[str, Any],
+        normalized_text: str,
+        lower_text: str,
+        timestamp: str,
+    ) -> Dict[str, Any]:
+        self._update_public_speaking_metrics(state, normalized_text)
+        state["stage"] = "followup"
+        state["followup_index"] = 0
+        session["public_speaking_state"] = state
+        self._mark_turn_dirty(session)
+        return self._public_speaking_prompt(
+            self._followup_question(0),
+            "Follow-up 1 of 3",
+        )
 
-            state["followup_index"] = next_index
-            session["public_speaking_state"] = state
-            await self.session_manager._save_session(session_id)
-            return self._public_speaking_prompt(
-                self._followup_question(next_index),
-                f"Follow-up {next_index + 1} of {state.get('followup_total', 3)}",
-            )
+    async def _ps_stage_followup(
+        self,
+        session_id: str,
+        state: Dict[str, Any],
+        session: Dict[str, Any],
+        normalized_text: str,
+        lower_text: str,
+        timestamp: str,
+    ) -> Dict[str, Any]:
+        self._update_public_speaking_metrics(state, normalized_text)
+        next_index = int(state.get("followup_index", 0)) + 1
+        if next_index >= int(state.get("followup_total", 3)):
+            await self.session_manager.end_session(session_id)
+            report = await self.generate_vibe_report(session_id)
+            return {"type": "session_ended", "report": report}
 
+        state["followup_index"] = next_index
+        session["public_speaking_state"] = state
+        self._mark_turn_dirty(session)
         return self._public_speaking_prompt(
-            "Let us continue.",
-            "Public speaking",
+            self._followup_question(next_index),
+            f"Follow-up {next_index + 1} of {state.get('followup_total', 3)}",
         )
 
+    def _public_speaking_prompt_for(self, key: str) -> Dict[str, Any]:
+        response = _PUBLIC_SPEAKING_PROMPTS[key].copy()
+        response["timestamp"] = self._now_iso()
+        return response
+
     def _public_speaking_prompt(self, voice_text: str, visual_text: str) -> Dict[str, Any]:
-        avatar_payload = {"expression": "encouraging", "gesture": "listening"}
         return {
             "type": "coach_response",
             "voice_text": voice_text,
             "visual_content": visual_text,
-            "avatar_intent": avatar_payload,
-            "avatar_state": avatar_payload,
+            "avatar_intent": _AVATAR_ENCOURAGING_LISTENING,
+            "avatar_state": _AVATAR_ENCOURAGING_LISTENING,
             "pedagogical_state": "evaluating",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._now_iso(),
         }
 
     def _followup_question(self, index: int) -> str:
-        questions = [
-            "Can you summarize your main point in one sentence?",
-            "What is one real-world example that supports your point?",
-            "Who is your target audience?",
-        ]
-        return questions[min(index, len(questions) - 1)]
+        return _FOLLOWUP_QUESTIONS[min(index, len(_FOLLOWUP_QUESTIONS) - 1)]
 
     def _update_public_speaking_metrics(self, state: Dict[str, Any], text: str) -> None:
-        words = [w for w in text.split() if w]
-        state["word_count"] = int(state.get("word_count", 0)) + len(words)
+        # split() without arguments already drops empty strings.
+        state["word_count"] += len(text.split())
 
-        filler_words = ["um", "uh", "like", "you know", "basically", "literally"]
-        lowered = text.lower()
-        filler_count = sum(lowered.count(word) for word in filler_words)
-        state["filler_count"] = int(state.get("filler_count", 0)) + filler_count
+        # _FILLER_RE ignores case and "..." has no case, so no lowered copy is needed.
+        filler_count = len(_FILLER_RE.findall(text))
+        state["filler_count"] += filler_count
 
-        state["pause_count"] = int(state.get("pause_count", 0)) + lowered.count("...")
+        state["pause_count"] += text.count("...")
 
     def _is_public_speaking_done(self, text: str) -> bool:
-        return any(token in text for token in ["done", "thank you", "thanks", "finished", "end"])
+        return _DONE_RE.search(text) is not None
 
     def _normalize_speaking_type(self, text: str) -> Optional[str]:
-        normalized = (text or "").strip().lower()
-        type_map = {
-            "interview answer": "Interview answer",
-            "interview": "Interview answer",
-            "presentation": "Presentation",
-            "pitch": "Pitch",
-            "storytelling": "Storytelling",
-            "story": "Storytelling",
-            "casual conversation": "Casual conversation",
-            "conversation": "Casual conversation",
-        }
-
-        for key, value in type_map.items():
-            if key in normalized:
-                return value
-        return None
+        return _match_speaking_type((text or "").strip().lower())
 
     async def process_biometric(self, session_id: str, biometric_data: Dict[str, Any]):
         """Process and store biometric data."""
         await self.session_manager.add_biometric_data(session_id, biometric_data)
 
-    async def _tutoring_response(self, session_id: str, transcript: str, biometric: Dict[str, Any]) -> Dict[str, Any]:
+    async def _tutoring_response(
+        self,
+        session_id: str,
+        transcript: str,
+        biometric: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
         """Generate tutoring mode response."""
         return await self.process_text(session_id, transcript)
 
-    async def _interview_response(self, session_id: str, transcript: str) -> Dict[str, Any]:
+    async def _interview_response(
+        self,
+        session_id: str,
+        transcript: str,
+        biometric: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
         """Generate interview mode response."""
         return await self.process_text(session_id, transcript)
 
-    async def _public_speaking_response(self, session_id: str, transcript: str) -> Dict[str, Any]:
+    async def _public_speaking_response(
+        self,
+        session_id: str,
+        transcript: str,
+        biometric: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
         """Generate public speaking mode response."""
         return await self.process_text(session_id, transcript)
 
-    async def _default_response(self, session_id: str, transcript: str) -> Dict[str, Any]:
+    async def _default_response(
+        self,
+        session_id: str,
+        transcript: str,
+        biometric: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
         """Default conversational response."""
         return await self.process_text(session_id, transcript)
 
@@ -902,15 +1257,8 @@ Return ONLY raw JSON:
         """Handle barge-in interruption."""
         trigger_type = trigger["trigger_type"]
 
-        feedback_messages = {
-            "filler_words": "Stop. You are using too many filler words. Take a breath and restart your thought clearly.",
-            "stress_spike": "Pause. I can tell you are nervous. Take a moment to collect yourself.",
-            "gaze_away": "Look at me. Maintain eye contact when speaking.",
-            "combined": "Stop. Let us reset. You are showing stress, poor eye contact, and using filler words. Breathe and try again.",
-        }
-
-        text = feedback_messages.get(trigger_type, "Let us pause and refocus.")
-        avatar_payload = {"expression": "concerned", "gesture": "pointing"}
+        text = _BARGE_IN_MESSAGES.get(trigger_type, "Let us pause and refocus.")
+        timestamp = self._now_iso()
 
         await self.session_manager.add_interaction(
             session_id,
@@ -919,7 +1267,7 @@ Return ONLY raw JSON:
                 "role": "assistant",
                 "content": text,
                 "visual_content": text,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": timestamp,
             },
         )
 
@@ -928,10 +1276,10 @@ Return ONLY raw JSON:
             "text": text,
             "voice_text": text,
             "visual_content": text,
-            "avatar_intent": avatar_payload,
-            "avatar_state": avatar_payload,
+            "avatar_intent": _AVATAR_CONCERNED_POINTING,
+            "avatar_state": _AVATAR_CONCERNED_POINTING,
             "trigger": trigger,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
         }
 
     async def generate_vibe_report(self, session_id: str) -> Dict[str, Any]:
@@ -954,12 +1302,18 @@ Return ONLY raw JSON:
 
         biometric_timeline = session.get("biometric_timeline", [])
         interactions = session.get("interactions", [])
-        discussion_summary = self._build_discussion_summary(session)
-        discussion_points = self._extract_discussion_points(session)
+        discussion_summary, discussion_points = self._extract_and_summarize(session)
 
-        peak_frame = self._find_peak_confidence(biometric_timeline)
+        if "peak_confidence_score" in session:
+            peak_frame = session.get("peak_confidence_frame")
+        else:
+            peak_frame = self._find_peak_confidence(biometric_timeline)
 
-        stress_events = sum(1 for b in biometric_timeline if b.get("stress_level") == "high")
+        stats = session.get("biometric_stats")
+        if stats:
+            stress_events = stats["high_stress_count"]
+        else:
+            stress_events = sum(1 for b in biometric_timeline if b.get("stress_level") == "high")
         barge_in_count = sum(1 for i in interactions if i.get("type") == "barge_in")
 
         analysis_prompt = f"""Analyze this coaching session and return ONLY raw JSON:
@@ -983,8 +1337,10 @@ Session data:
             response = await asyncio.to_thread(model.generate_content, analysis_prompt)
             text = getattr(response, "text", "") or ""
             start = text.find("{")
-            end = text.rfind("}") + 1
-            report_data = json.loads(text[start:end])
+            if start < 0:
+                raise ValueError("No JSON object in report response")
+            # Decode in place from the first brace; trailing prose is ignored.
+            report_data, _ = _JSON_DECODER.raw_decode(text, start)
         except Exception as e:
             report_data = {
                 "overall_score": 75,
@@ -1011,17 +1367,14 @@ Session data:
         state = session.get("public_speaking_state", {})
         topic = state.get("topic", "Unknown Topic")
         speaking_type = state.get("speaking_type", "Public Speaking")
-        word_count = int(state.get("word_count", 0))
-        filler_count = int(state.get("filler_count", 0))
-        pause_count = int(state.get("pause_count", 0))
+        word_count = state.get("word_count", 0)
+        filler_count = state.get("filler_count", 0)
+        pause_count = state.get("pause_count", 0)
 
         duration_minutes = 3.0
-        if state.get("main_speech_start"):
-            try:
-                start_time = datetime.fromisoformat(state["main_speech_start"])
-                duration_minutes = max(0.5, (datetime.now() - start_time).total_seconds() / 60)
-            except Exception:
-                duration_minutes = 3.0
+        elapsed = self._seconds_since(state, "main_speech_start_epoch", "main_speech_start")
+        if elapsed is not None:
+            duration_minutes = max(0.5, elapsed / 60)
 
         wpm = int(word_count / duration_minutes) if duration_minutes else 0
 
@@ -1045,6 +1398,8 @@ Return ONLY raw JSON:
   "moment_feedback": "short moment-level feedback"
 }}"""
 
+        # Summarize before the await so the session cannot change underneath it.
+        discussion_summary, discussion_points = self._extract_and_summarize(session)
         response = await self.gemini.generate_json_response(prompt, mode="public_speaking", thinking_level="high")
         if not isinstance(response, dict):
             response = {}
@@ -1063,29 +1418,20 @@ Return ONLY raw JSON:
             "Midway through, add a short transition to keep momentum.",
         )
 
-        analysis = (
-            f"Topic: {topic}\n"
-            f"Duration: {duration_minutes:.1f} minutes\n"
-            f"Overall Score: {overall_score} / 100\n"
-            f"Level: {level}\n\n"
-            f"Skill Breakdown:\n"
-            f"- Clarity: {scores.get('clarity', 7)}/10\n"
-            f"- Confidence: {scores.get('confidence', 7)}/10\n"
-            f"- Structure: {scores.get('structure', 6)}/10\n"
-            f"- Pace: {scores.get('pace', 7)}/10\n"
-            f"- Engagement: {scores.get('engagement', 7)}/10\n\n"
-            f"Voice and Delivery:\n"
-            f"- Avg Speaking Speed: {wpm} wpm\n"
-            f"- Filler Words: {filler_count}\n"
-            f"- Pauses: {pause_count}\n\n"
-            f"Strengths:\n- {strengths[0] if strengths else 'Clear delivery'}\n\n"
-            f"Improvement Areas:\n- {improvements[0] if improvements else 'Add stronger conclusion'}\n\n"
-            f"Moment-Level Feedback:\n{moment_feedback}\n\n"
-            f"Next Steps:\n{next_steps}"
-        )
-
-        discussion_summary = self._build_discussion_summary(session)
-        discussion_points = self._extract_discussion_points(session)
+        fields = {
+            "topic": topic,
+            "duration": duration_minutes,
+            "overall_score": overall_score,
+            "level": level,
+            "wpm": wpm,
+            "filler_count": filler_count,
+            "pause_count": pause_count,
+            "strength": strengths[0] if strengths else "Clear delivery",
+            "improvement": improvements[0] if improvements else "Add stronger conclusion",
+            "moment_feedback": moment_feedback,
+            "next_steps": next_steps,
+        }
+        analysis = _PS_ANALYSIS_TEMPLATE.format_map(ChainMap(fields, scores, _PS_SCORE_DEFAULTS))
 
         return {
             "session_id": session_id,
@@ -1105,18 +1451,18 @@ Return ONLY raw JSON:
         interactions = session.get("interactions", [])
         role = session.get("interview_state", {}).get("role", "the role")
 
-        summary_lines = []
-        for interaction in interactions[-20:]:
-            if interaction.get("role") == "user":
-                summary_lines.append(f"User: {interaction.get('content', '')}")
-            elif interaction.get("role") == "assistant":
-                summary_lines.append(f"AI: {interaction.get('content', '')}")
+        summary_lines = [
+            f"{_ROLE_PREFIX[interaction['role']]}{interaction.get('content', '')}"
+            for interaction in interactions[-20:]
+            if interaction.get("role") in _ROLE_PREFIX
+        ]
+        transcript = "\n".join(summary_lines)
 
         prompt = f"""You are an interview evaluator. Summarize the interview performance.
 
 Role: {role}
 Transcript (recent):
-{chr(10).join(summary_lines)}
+{transcript}
 
 Return ONLY raw JSON:
 {{
@@ -1128,6 +1474,7 @@ Return ONLY raw JSON:
   "next_steps": "short next steps"
 }}"""
 
+        discussion_summary, discussion_points = self._extract_and_summarize(session)
         response = await self.gemini.generate_json_response(prompt, mode="interview", thinking_level="high")
         if not isinstance(response, dict):
             response = {}
@@ -1139,18 +1486,13 @@ Return ONLY raw JSON:
         top_improvement = response.get("top_improvement", "Add more concrete examples")
         next_steps = response.get("next_steps", "Practice concise answers and review core concepts for the role.")
 
-        analysis = (
-            f"Overall Level: {overall_level}\n\n"
-            f"Scores (1-10):\n"
-            f"- Technical: {scores.get('technical', 7)}\n"
-            f"- Problem Solving: {scores.get('problem_solving', 7)}\n"
-            f"- Communication: {scores.get('communication', 7)}\n\n"
-            f"Top Strength: {top_strength}\n"
-            f"Top Improvement Area: {top_improvement}\n\n"
-            f"Next Steps: {next_steps}"
-        )
-        discussion_summary = self._build_discussion_summary(session)
-        discussion_points = self._extract_discussion_points(session)
+        fields = {
+            "overall_level": overall_level,
+            "top_strength": top_strength,
+            "top_improvement": top_improvement,
+            "next_steps": next_steps,
+        }
+        analysis = _INTERVIEW_ANALYSIS_TEMPLATE.format_map(ChainMap(fields, scores, _INTERVIEW_SCORE_DEFAULTS))
 
         return {
             "session_id": session_id,
@@ -1176,7 +1518,8 @@ Return ONLY raw JSON:
             content = (entry.get("content") or "").strip()
             if not content:
                 continue
-            normalized = " ".join(content.split())
+            # Only rebuild when there is whitespace to collapse.
+            normalized = " ".join(content.split()) if _COLLAPSIBLE_WS_RE.search(content) else content
             if len(normalized) > 140:
                 normalized = f"{normalized[:137]}..."
             if normalized in points:
@@ -1187,9 +1530,15 @@ Return ONLY raw JSON:
 
         return points
 
-    def _build_discussion_summary(self, session: Dict[str, Any]) -> str:
+    def _extract_and_summarize(self, session: Dict[str, Any]) -> Tuple[str, List[str]]:
+        """Return the discussion summary and points from one pass over the history."""
+        points = self._extract_discussion_points(session)
+        return self._build_discussion_summary(session, points[:3]), points
+
+    def _build_discussion_summary(self, session: Dict[str, Any], points: Optional[List[str]] = None) -> str:
         mode = session.get("mode", "session")
-        points = self._extract_discussion_points(session, max_points=3)
+        if points is None:
+            points = self._extract_discussion_points(session, max_points=3)
         if not points:
             return f"You completed a {mode.replace('_', ' ')} session. No detailed discussion transcript was captured."
 
@@ -1205,16 +1554,7 @@ Return ONLY raw JSON:
         if not biometric_timeline:
             return None
 
-        scored_frames = []
-        for frame in biometric_timeline:
-            hr = frame.get("heart_rate", 100)
-            posture = frame.get("posture_score", 0)
-            score = posture - (hr / 100)
-            scored_frames.append((score, frame))
-
-        if scored_frames:
-            return max(scored_frames, key=lambda x: x[0])[1]
-        return None
+        return max(biometric_timeline, key=confidence_score)
 
 
 class BargeInDetector:
@@ -1230,23 +1570,21 @@ class BargeInDetector:
         Determine if barge-in should be triggered.
         Returns trigger details if should interrupt, otherwise None.
         """
+        threshold = max(1, int(3 * (1 - sensitivity)))
         triggers: List[str] = []
 
-        filler_words = ["um", "uh", "like", "you know", "basically", "literally"]
-        filler_count = sum(transcript.lower().count(word) for word in filler_words)
-
-        if filler_count >= 3:
-            triggers.append("filler_words")
-
+        # Biometric checks are a couple of dict lookups; run them before the transcript scan.
         if biometric_data:
             if biometric_data.get("stress_level") == "high":
                 triggers.append("stress_spike")
 
-            gaze = biometric_data.get("gaze_direction", [0, 0, 0])
+            gaze = biometric_data.get("gaze_direction") or _ZERO_GAZE
             if abs(gaze[0]) > 0.5 or abs(gaze[1]) > 0.5:
                 triggers.append("gaze_away")
 
-        threshold = max(1, int(3 * (1 - sensitivity)))
+        # Only scan for fillers when biometrics alone have not already decided it.
+        if len(triggers) < threshold and transcript and len(_FILLER_RE.findall(transcript)) >= 3:
+            triggers.insert(0, "filler_words")
 
         if len(triggers) >= threshold:
             return {
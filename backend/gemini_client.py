@@ -3,11 +3,17 @@ Gemini API Client
 Handles communication with Google's Generative AI
 """
 
-from typing import Any, AsyncIterator, Dict, List, Optional
+from binascii import b2a_base64
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 import asyncio
-import base64
+import copy
+import hashlib
 import json
+import logging
 import re
+import time
 
 import google.generativeai as genai
 try:
@@ -16,6 +22,163 @@ try:
 except Exception:  # pragma: no cover
     genai_live = None
     genai_types = None
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# How long to skip new requests after every candidate failed with 429/5xx.
+_COOLDOWN_SECONDS = 10.0
+# How long a genai.list_models() result (and the rankings built from it) stays fresh.
+_DISCOVERY_TTL_SECONDS = 300.0
+# How long to stop calling genai.list_models() after it failed.
+_DISCOVERY_BACKOFF_SECONDS = 30.0
+# How long the preferred model may stall before the runner-up is raced against it.
+_HEDGE_DELAY_SECONDS = 2.5
+# Parsed responses kept for identical prompts (retries, "repeat that").
+_RESPONSE_CACHE_LIMIT = 512
+
+_SAFETY_SETTINGS = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
+]
+
+# Filled with current_step/next_step per call; literal braces are doubled.
+_TUTORING_PROMPT_TEMPLATE = """You are an Elite Socratic Tutor. Lead the student through a topic using a synchronized Whiteboard experience.
+
+RULES:
+1. TAKE CHARGE ONLY ON FIRST TURN: If this is the first response, start explaining immediately.
+2. FOLLOW-UP PRIORITY: For later turns, answer the MOST RECENT user message directly first.
+3. NO REPETITION: Do NOT repeat earlier explanations unless the user explicitly asks to recap/repeat.
+4. LOGICAL-STEPS: Break explanations into 1-3 sentence "steps".
+5. VISUAL-FIRST: Every major concept MUST be shown on the whiteboard.
+6. MONOTONIC: Continue incrementing "step" numbers. Current step is {current_step}, so next step should be >= {next_step}.
+7. CHECK-INS: Every 3-4 steps, perform a "check_in".
+8. RELEVANCE: Keep response tightly aligned to the latest user question.
+
+OUTPUT SCHEMA (Return ONLY raw JSON):
+- {{ "kind": "step", "step": 1, "subtopic_id": "intro", "narration": "..", "visual": {{ "type": "equation", "content": ".." }}, "avatar_intent": {{"expression": "..", "gesture": ".."}} }}
+- {{ "kind": "check_in", "narration": "..", "options": [".."], "step": 5 }}
+
+VISUAL TYPES: "equation", "step_list" ({{"steps": []}}), "diagram" (DRAW_NUMBER_LINE, DRAW_COORDINATE_PLANE, DRAW_BOXES_AND_ARROWS: Label1, Label2, Label3, Description), "table", "none".
+"""
+
+_SYSTEM_PROMPTS = {
+    "public_speaking": """You are a Public Speaking Coach.
+Stay silent while the user speaks unless they stop for a long time.
+Provide feedback on pace, confidence, and clarity.
+Always return JSON with:
+{
+  "voice_text": "Brief spoken feedback to keep them inspired",
+  "visual_content": "Detailed bullet points of feedback for the user to read",
+  "avatar_intent": {"expression": "neutral/encouraging", "gesture": "listening/nodding"},
+  "pedagogical_state": "evaluating"
+}""",
+    "interview": """You are a Professional Interviewer.
+Ask role-specific questions. Be challenging but fair.
+Always return JSON with:
+{
+  "voice_text": "The next interview question or follow-up",
+  "visual_content": "Strengths/Improvements of their last answer. Use bullet points.",
+  "avatar_intent": {"expression": "neutral/skeptical", "gesture": "listening/thinking"},
+  "pedagogical_state": "evaluating"
+}""",
+}
+
+_DEFAULT_SYSTEM_PROMPT = "You are a helpful AI assistant. Return JSON with voice_text and visual_content."
+
+# Shared by every model built for a thinking level; treat as read-only.
+_GEN_CONFIG_LOW = {
+    "temperature": 0.7,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 2048,
+}
+_GEN_CONFIG_HIGH = {**_GEN_CONFIG_LOW, "temperature": 0.4}
+
+_FENCED_JSON_RE = re.compile(r"```json\s*(.*?)\s*```", re.DOTALL | re.IGNORECASE)
+_FENCED_GENERIC_RE = re.compile(r"```\s*(.*?)\s*```", re.DOTALL)
+
+
+@lru_cache(maxsize=32)
+def _field_value_re(field: str) -> "re.Pattern[str]":
+    return re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+
+
+@lru_cache(maxsize=16)
+def _audio_generation_config(thinking_level: str, voice_name: str) -> Dict[str, Any]:
+    return {
+        **(_GEN_CONFIG_LOW if thinking_level == "low" else _GEN_CONFIG_HIGH),
+        "response_modalities": ["AUDIO"],
+        "speech_config": {
+            "voice_config": {
+                "prebuilt_voice_config": {"voice_name": voice_name},
+            },
+        },
+    }
+
+
+def _b64(data: bytes) -> str:
+    """Base64-encode audio bytes for JSON frames."""
+    return b2a_base64(data, newline=False).decode("ascii")
+
+
+def _loads(text: str) -> Any:
+    """Decode model JSON with orjson when available, stdlib json otherwise.
+
+    orjson is stricter than the stdlib (no NaN/Infinity, no lone surrogates),
+    so anything it rejects gets a second chance with json.loads.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
+class _JsonObjectScanner:
+    """Incrementally find top-level {...} objects in streamed text."""
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._start = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> List[str]:
+        """Append text and return any top-level objects it completed."""
+        self.buffer += text
+        completed: List[str] = []
+        buffer = self.buffer
+        for idx in range(self._pos, len(buffer)):
+            ch = buffer[idx]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == "{":
+                if self._depth == 0:
+                    self._start = idx
+                self._depth += 1
+            elif ch == "}":
+                if self._depth:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        completed.append(buffer[self._start:idx + 1])
+            elif ch == '"' and self._depth:
+                self._in_string = True
+        self._pos = len(buffer)
+        return completed
 
 
 class GeminiClient:
@@ -25,13 +188,48 @@ class GeminiClient:
         self.api_key = api_key
         self._preferred_models: Dict[str, Optional[str]] = {"low": None, "high": None}
         self._live_client = None
+        self._cooldown_until = 0.0
+        self._discovered_cache: Optional[Tuple[float, List[str]]] = None
+        self._discover_failed_until = 0.0
+        self._ranked_cache: Dict[Tuple[str, Optional[str]], Tuple[float, Tuple[str, ...]]] = {}
+        self._model_cache: Dict[Tuple[str, str, Optional[str]], Any] = {}
+        self._response_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         if api_key:
             genai.configure(api_key=api_key)
             if genai_live:
                 try:
                     self._live_client = genai_live.Client(api_key=api_key)
                 except Exception as e:
-                    print(f"Warning: Could not init Live client: {e}")
+                    logger.warning("Could not init Live client: %s", e)
+
+    def in_cooldown(self) -> bool:
+        """True while backing off after the API reported rate limiting or a server error."""
+        return time.monotonic() < self._cooldown_until
+
+    def _note_failure(self, error: Exception):
+        code = getattr(error, "code", None)
+        if isinstance(code, int) and (code == 429 or 500 <= code < 600):
+            self._cooldown_until = time.monotonic() + _COOLDOWN_SECONDS
+
+    def _response_cache_key(self, mode: str, thinking_level: str, prompt: str) -> str:
+        return hashlib.blake2b(
+            f"{mode}|{thinking_level}|{prompt}".encode("utf-8"),
+            digest_size=16,
+        ).hexdigest()
+
+    def _cached_response(self, key: str) -> Optional[Dict[str, Any]]:
+        cached = self._response_cache.get(key)
+        if cached is None:
+            return None
+        self._response_cache.move_to_end(key)
+        # Callers mutate the result, so never hand out the cached dict itself.
+        return copy.deepcopy(cached)
+
+    def _store_response(self, key: str, parsed: Dict[str, Any]):
+        self._response_cache[key] = copy.deepcopy(parsed)
+        self._response_cache.move_to_end(key)
+        if len(self._response_cache) > _RESPONSE_CACHE_LIMIT:
+            self._response_cache.popitem(last=False)
 
     def _audio_candidate_models(self) -> List[str]:
         return [
@@ -49,12 +247,7 @@ class GeminiClient:
         return bool(self.api_key)
 
     def _generation_config(self, thinking_level: str) -> Dict[str, Any]:
-        return {
-            "temperature": 0.7 if thinking_level == "low" else 0.4,
-            "top_p": 0.95,
-            "top_k": 40,
-            "max_output_tokens": 2048,
-        }
+        return _GEN_CONFIG_LOW if thinking_level == "low" else _GEN_CONFIG_HIGH
 
     def _normalize_model_name(self, model_name: str) -> str:
         if model_name.startswith("models/"):
@@ -62,6 +255,14 @@ class GeminiClient:
         return f"models/{model_name}"
 
     def _discover_models(self) -> List[str]:
+        now = time.monotonic()
+        if self._discovered_cache and now - self._discovered_cache[0] < _DISCOVERY_TTL_SECONDS:
+            return self._discovered_cache[1]
+        # On a failed or backed-off refresh, keep serving the last good listing if there is one.
+        stale: List[str] = self._discovered_cache[1] if self._discovered_cache else []
+        if now < self._discover_failed_until:
+            return stale
+
         discovered: List[str] = []
         try:
             for model in genai.list_models():
@@ -70,10 +271,19 @@ class GeminiClient:
                 if "generateContent" in methods and name.startswith("gemini"):
                     discovered.append(name)
         except Exception as e:
-            print(f"Warning: Could not list Gemini models: {e}")
+            logger.warning("Could not list Gemini models: %s", e)
+            self._discover_failed_until = now + _DISCOVERY_BACKOFF_SECONDS
+            return stale
+        self._discovered_cache = (now, discovered)
         return discovered
 
-    def _candidate_models(self, thinking_level: str = "low") -> List[str]:
+    def _candidate_models(self, thinking_level: str = "low") -> Tuple[str, ...]:
+        preferred = self._preferred_models.get(thinking_level)
+        key = (thinking_level, preferred)
+        cached = self._ranked_cache.get(key)
+        if cached and time.monotonic() - cached[0] < _DISCOVERY_TTL_SECONDS:
+            return cached[1]
+
         static_fallback_low = [
             "gemini-3.0-flash",
             "gemini-3.0-flash-lite",
@@ -84,7 +294,6 @@ class GeminiClient:
         ]
 
         candidates: List[str] = []
-        preferred = self._preferred_models.get(thinking_level)
         if preferred and preferred.startswith("gemini-3"):
             candidates.append(preferred)
 
@@ -113,17 +322,27 @@ class GeminiClient:
 
         candidates.extend(static_fallback_high if thinking_level == "high" else static_fallback_low)
 
-        deduped: List[str] = []
-        for model_name in candidates:
-            if model_name not in deduped:
-                deduped.append(model_name)
-        return deduped
-
-    def _create_model(self, model_name: str, thinking_level: str = "low"):
-        return genai.GenerativeModel(
-            model_name=self._normalize_model_name(model_name),
-            generation_config=self._generation_config(thinking_level),
-        )
+        ranked_candidates = tuple(dict.fromkeys(candidates))
+        if self._discovered_cache:
+            # Only cache rankings built from a successful listing; retry discovery otherwise.
+            self._ranked_cache[key] = (self._discovered_cache[0], ranked_candidates)
+        return ranked_candidates
+
+    def _create_model(self, model_name: str, thinking_level: str = "low", voice_name: Optional[str] = None):
+        """Return a cached model; passing voice_name selects the audio generation config."""
+        key = (self._normalize_model_name(model_name), thinking_level, voice_name)
+        model = self._model_cache.get(key)
+        if model is None:
+            if voice_name is None:
+                generation_config = self._generation_config(thinking_level)
+            else:
+                generation_config = _audio_generation_config(thinking_level, voice_name)
+            model = genai.GenerativeModel(
+                model_name=key[0],
+                generation_config=generation_config,
+            )
+            self._model_cache[key] = model
+        return model
 
     def get_model(self, thinking_level: str = "low"):
         """Return a best-effort model instance for callers that need a model object."""
@@ -131,16 +350,70 @@ class GeminiClient:
             try:
                 model = self._create_model(model_name, thinking_level)
                 self._preferred_models[thinking_level] = model_name
-                print(f"Using Gemini model: {model_name}")
+                logger.info("Using Gemini model: %s", model_name)
                 return model
             except Exception as e:
-                print(f"Model init failed for {model_name}: {e}")
+                logger.warning("Model init failed for %s: %s", model_name, e)
 
         return genai.GenerativeModel(
             model_name="models/gemini-pro",
             generation_config=self._generation_config(thinking_level),
         )
 
+    async def _try_model(
+        self,
+        model_name: str,
+        prompt: str,
+        thinking_level: str,
+        safety_settings: Optional[List[Dict[str, str]]],
+    ):
+        model = self._create_model(model_name, thinking_level)
+        if safety_settings:
+            return await asyncio.to_thread(
+                model.generate_content,
+                prompt,
+                safety_settings=safety_settings,
+            )
+        return await asyncio.to_thread(model.generate_content, prompt)
+
+    async def _first_success(
+        self,
+        model_names: List[str],
+        attempt: Callable[[str], Awaitable[Any]],
+    ) -> Tuple[str, Any]:
+        """Return (model_name, attempt(model_name)) for whichever model succeeds first.
+
+        Each model starts once the previous one failed or stalled for
+        _HEDGE_DELAY_SECONDS. Losers are cancelled, though a request already
+        running in a worker thread still finishes and is discarded.
+        """
+        queue = list(model_names)
+        pending: Dict["asyncio.Task[Any]", str] = {}
+        last_error: Optional[Exception] = None
+        try:
+            while queue or pending:
+                if queue:
+                    model_name = queue.pop(0)
+                    task = asyncio.create_task(attempt(model_name))
+                    pending[task] = model_name
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=_HEDGE_DELAY_SECONDS if queue else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    model_name = pending.pop(task)
+                    try:
+                        return model_name, task.result()
+                    except Exception as e:
+                        last_error = e
+                        logger.warning("Gemini request failed for %s: %s", model_name, e)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise last_error or RuntimeError("No Gemini model candidates available")
+
     async def _generate_with_fallback(
         self,
         prompt: str,
@@ -148,70 +421,222 @@ class GeminiClient:
         safety_settings: Optional[List[Dict[str, str]]] = None,
     ):
         last_error: Optional[Exception] = None
+        candidates = self._candidate_models(thinking_level)
 
-        for model_name in self._candidate_models(thinking_level):
+        if candidates:
             try:
-                model = self._create_model(model_name, thinking_level)
-                if safety_settings:
-                    response = await asyncio.to_thread(
-                        model.generate_content,
-                        prompt,
-                        safety_settings=safety_settings,
-                    )
-                else:
-                    response = await asyncio.to_thread(model.generate_content, prompt)
+                model_name, response = await self._first_success(
+                    list(candidates[:2]),
+                    lambda name: self._try_model(name, prompt, thinking_level, safety_settings),
+                )
+                self._preferred_models[thinking_level] = model_name
+                self._cooldown_until = 0.0
+                return response
+            except Exception as e:
+                last_error = e
 
+        for model_name in candidates[2:]:
+            try:
+                response = await self._try_model(model_name, prompt, thinking_level, safety_settings)
                 self._preferred_models[thinking_level] = model_name
+                self._cooldown_until = 0.0
                 return response
             except Exception as e:
                 last_error = e
-                print(f"Gemini request failed for {model_name}: {e}")
+                logger.warning("Gemini request failed for %s: %s", model_name, e)
 
         if last_error:
+            self._note_failure(last_error)
             raise last_error
         raise RuntimeError("No Gemini model candidates available")
 
+    def _chunk_text(self, chunk: Any) -> str:
+        try:
+            return chunk.text or ""
+        except Exception:
+            # Chunks without text parts (e.g. a final safety/finish chunk) raise on .text
+            return ""
+
+    async def _open_stream(
+        self,
+        model_name: str,
+        prompt: str,
+        thinking_level: str,
+        safety_settings: Optional[List[Dict[str, str]]],
+    ) -> Tuple[Any, Any]:
+        """Start a streaming request and return (chunk iterator, first chunk)."""
+        model = self._create_model(model_name, thinking_level)
+        kwargs: Dict[str, Any] = {"stream": True}
+        if safety_settings:
+            kwargs["safety_settings"] = safety_settings
+        response = await asyncio.to_thread(model.generate_content, prompt, **kwargs)
+        chunks = iter(response)
+        try:
+            chunk = await asyncio.to_thread(next, chunks, None)
+        except Exception:
+            self._close_stream(chunks)
+            raise
+        return chunks, chunk
+
+    @staticmethod
+    def _close_stream(chunks: Any) -> None:
+        close = getattr(chunks, "close", None)
+        if close is None:
+            return
+        try:
+            close()
+        except Exception as e:
+            # A worker thread may still be inside next() after a cancellation.
+            logger.debug("Could not close Gemini stream: %s", e)
+
+    async def _stream_with_fallback(
+        self,
+        prompt: str,
+        thinking_level: str = "low",
+        safety_settings: Optional[List[Dict[str, str]]] = None,
+    ) -> AsyncIterator[str]:
+        """Yield response text chunks from the first model that starts streaming.
+
+        The top two candidates race for the first chunk like _generate_with_fallback;
+        a losing stream whose worker thread is already running is left to finish and
+        be discarded. The rest are tried one at a time.
+        """
+        last_error: Optional[Exception] = None
+        candidates = self._candidate_models(thinking_level)
+
+        def open_stream(name: str) -> Awaitable[Tuple[Any, Any]]:
+            return self._open_stream(name, prompt, thinking_level, safety_settings)
+
+        opened: Optional[Tuple[Any, Any]] = None
+        if candidates:
+            try:
+                model_name, opened = await self._first_success(list(candidates[:2]), open_stream)
+            except Exception as e:
+                last_error = e
+
+        if opened is None:
+            for model_name in candidates[2:]:
+                try:
+                    opened = await open_stream(model_name)
+                    break
+                except Exception as e:
+                    last_error = e
+                    logger.warning("Gemini stream failed for %s: %s", model_name, e)
+
+        if opened is None:
+            if last_error:
+                self._note_failure(last_error)
+                raise last_error
+            raise RuntimeError("No Gemini model candidates available")
+
+        self._preferred_models[thinking_level] = model_name
+        self._cooldown_until = 0.0
+        chunks, chunk = opened
+        try:
+            while chunk is not None:
+                text = self._chunk_text(chunk)
+                if text:
+                    yield text
+                chunk = await asyncio.to_thread(next, chunks, None)
+        finally:
+            self._close_stream(chunks)
+
+    def _read_json_string_field(self, text: str, field: str) -> Optional[str]:
+        """Return the decoded value of `"field": "..."` once its closing quote has arrived."""
+        match = _field_value_re(field).search(text)
+        if not match:
+            return None
+        start = match.end() - 1
+        idx = match.end()
+        while idx < len(text):
+            ch = text[idx]
+            if ch == "\\":
+                idx += 2
+                continue
+            if ch == '"':
+                try:
+                    return _loads(text[start:idx + 1])
+                except ValueError:
+                    return None
+            idx += 1
+        return None
+
     def _extract_json_candidates(self, text: str) -> List[str]:
+        """Return JSON candidates most-likely first: ```json fences, the whole reply, other fences, brace spans."""
         candidates: List[str] = []
         if not text:
             return candidates
 
-        fenced_json = re.findall(r"```json\s*(.*?)\s*```", text, flags=re.DOTALL | re.IGNORECASE)
+        fenced_json = _FENCED_JSON_RE.findall(text)
         for block in fenced_json:
             block = block.strip()
             if block:
                 candidates.append(block)
 
-        fenced_generic = re.findall(r"```\s*(.*?)\s*```", text, flags=re.DOTALL)
+        raw = text.strip()
+        candidates.append(raw)
+        seen = set(candidates)
+
+        fenced_generic = _FENCED_GENERIC_RE.findall(text)
         for block in fenced_generic:
             block = block.strip()
-            if block and block not in candidates:
+            if block and block not in seen:
+                seen.add(block)
                 candidates.append(block)
 
-        raw = text.strip()
-        candidates.append(raw)
-
-        for start_idx, ch in enumerate(raw):
-            if ch != "{":
-                continue
-            depth = 0
-            for end_idx in range(start_idx, len(raw)):
-                if raw[end_idx] == "{":
-                    depth += 1
-                elif raw[end_idx] == "}":
-                    depth -= 1
-                    if depth == 0:
-                        snippet = raw[start_idx:end_idx + 1].strip()
-                        if snippet and snippet not in candidates:
-                            candidates.append(snippet)
-                        break
+        for start_idx, end_idx in self._scan_json_objects(raw):
+            snippet = raw[start_idx:end_idx + 1].strip()
+            if snippet and snippet not in seen:
+                seen.add(snippet)
+                candidates.append(snippet)
 
         return candidates
 
+    @staticmethod
+    def _scan_json_objects(raw: str) -> List[Tuple[int, int]]:
+        """Return (start, end) of every balanced {...} span in one pass, ordered by start.
+
+        Braces inside string literals are ignored once an object has opened.
+        """
+        spans: List[Tuple[int, int]] = []
+        stack: List[int] = []
+        in_string = False
+        escaped = False
+        for idx, ch in enumerate(raw):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == "{":
+                stack.append(idx)
+            elif ch == "}":
+                if stack:
+                    spans.append((stack.pop(), idx))
+            elif ch == '"' and stack:
+                in_string = True
+        spans.sort()
+        return spans
+
     def _parse_response_json(self, text: str) -> Optional[Dict[str, Any]]:
+        # Fast path: the prompts ask for raw JSON, which is what most replies are.
+        stripped = text.strip() if text else ""
+        if stripped.startswith("{") and stripped.endswith("}"):
+            try:
+                parsed = _loads(stripped)
+                if isinstance(parsed, dict):
+                    return parsed
+            except Exception:
+                pass
+
         for candidate in self._extract_json_candidates(text):
+            # Only objects are accepted, so skip anything that cannot be one without parsing it.
+            if not (candidate.startswith("{") and candidate.endswith("}")):
+                continue
             try:
-                parsed = json.loads(candidate)
+                parsed = _loads(candidate)
                 if isinstance(parsed, dict):
                     return parsed
             except Exception:
@@ -231,7 +656,19 @@ class GeminiClient:
                 data = data or audio.get("data")
             if mime_type and data:
                 if isinstance(data, bytes):
-                    data = base64.b64encode(data).decode("ascii")
+                    data = _b64(data)
+                return {"mime_type": mime_type, "data": data}
+
+        # Fast path for the SDK's usual shape: inline data on the first part of the first candidate.
+        try:
+            inline = response.candidates[0].content.parts[0].inline_data
+            mime_type, data = inline.mime_type, inline.data
+        except (AttributeError, IndexError, KeyError, TypeError):
+            pass
+        else:
+            if mime_type and data:
+                if isinstance(data, bytes):
+                    data = _b64(data)
                 return {"mime_type": mime_type, "data": data}
 
         candidates = getattr(response, "candidates", None) or []
@@ -251,7 +688,7 @@ class GeminiClient:
                     data = data or inline.get("data")
                 if mime_type and data:
                     if isinstance(data, bytes):
-                        data = base64.b64encode(data).decode("ascii")
+                        data = _b64(data)
                     return {"mime_type": mime_type, "data": data}
 
         return None
@@ -267,39 +704,23 @@ class GeminiClient:
             return None
 
         prompt = text
-
-        generation_config = self._generation_config(thinking_level)
-        generation_config = {
-            **generation_config,
-            "response_modalities": ["AUDIO"],
-            "speech_config": {
-                "voice_config": {
-                    "prebuilt_voice_config": {"voice_name": voice_name},
-                },
-            },
-        }
-
-        last_error: Optional[Exception] = None
         candidates = [model_name] if model_name else self._audio_candidate_models()
 
-        for candidate in candidates:
-            try:
-                model = genai.GenerativeModel(
-                    model_name=self._normalize_model_name(candidate),
-                    generation_config=generation_config,
-                )
-                response = await asyncio.to_thread(model.generate_content, prompt)
-                payload = self._extract_audio_payload(response)
-                if payload:
-                    self._preferred_models[thinking_level] = candidate
-                    return payload
-            except Exception as e:
-                last_error = e
-                print(f"Gemini audio failed for {candidate}: {e}")
+        async def attempt(candidate: str) -> Dict[str, str]:
+            model = self._create_model(candidate, thinking_level, voice_name)
+            response = await asyncio.to_thread(model.generate_content, prompt)
+            payload = self._extract_audio_payload(response)
+            if not payload:
+                raise ValueError("response contained no audio")
+            return payload
 
-        if last_error:
-            print(f"Gemini audio generation failed: {last_error}")
-        return None
+        try:
+            candidate, payload = await self._first_success(candidates, attempt)
+        except Exception as e:
+            logger.warning("Gemini audio generation failed: %s", e)
+            return None
+        self._preferred_models[thinking_level] = candidate
+        return payload
 
     async def stream_tts_audio(
         self,
@@ -328,7 +749,7 @@ class GeminiClient:
 
         for candidate in candidates:
             try:
-                print(f"Attempting Live API audio with model: {candidate}")
+                logger.info("Attempting Live API audio with model: %s", candidate)
                 async with self._live_client.aio.live.connect(model=candidate, config=config) as session:
                     await session.send(input=text, end_of_turn=True)
 
@@ -337,7 +758,7 @@ class GeminiClient:
                         if audio and getattr(audio, "data", None):
                             data = audio.data
                             if isinstance(data, bytes):
-                                data = base64.b64encode(data).decode("ascii")
+                                data = _b64(data)
                             yield {
                                 "mime_type": getattr(audio, "mime_type", None) or "audio/pcm",
                                 "data": data,
@@ -350,11 +771,11 @@ class GeminiClient:
                     connected = True
                     return
             except Exception as e:
-                print(f"Live API audio failed for {candidate}: {e}")
+                logger.warning("Live API audio failed for %s: %s", candidate, e)
                 continue
 
         if not connected:
-            print("All Live API models failed. Falling back to Unary TTS.")
+            logger.warning("All Live API models failed. Falling back to Unary TTS.")
             # Fallback to Unary TTS (non-streaming)
             # We treat the entire payload as a single "chunk"
             payload = await self.generate_audio_payload(
@@ -369,7 +790,7 @@ class GeminiClient:
                     "is_final": True
                 }
             else:
-                 print("Unary TTS fallback also failed.")
+                 logger.warning("Unary TTS fallback also failed.")
 
     async def generate_structured_response(
         self,
@@ -384,58 +805,21 @@ class GeminiClient:
         session_meta = session_meta or {}
         current_step = int(session_meta.get("current_step", 0))
 
-        system_prompts = {
-            "tutoring": f"""You are an Elite Socratic Tutor. Lead the student through a topic using a synchronized Whiteboard experience.
-
-RULES:
-1. TAKE CHARGE ONLY ON FIRST TURN: If this is the first response, start explaining immediately.
-2. FOLLOW-UP PRIORITY: For later turns, answer the MOST RECENT user message directly first.
-3. NO REPETITION: Do NOT repeat earlier explanations unless the user explicitly asks to recap/repeat.
-4. LOGICAL-STEPS: Break explanations into 1-3 sentence "steps".
-5. VISUAL-FIRST: Every major concept MUST be shown on the whiteboard.
-6. MONOTONIC: Continue incrementing "step" numbers. Current step is {current_step}, so next step should be >= {current_step + 1}.
-7. CHECK-INS: Every 3-4 steps, perform a "check_in".
-8. RELEVANCE: Keep response tightly aligned to the latest user question.
-
-OUTPUT SCHEMA (Return ONLY raw JSON):
-- {{ "kind": "step", "step": 1, "subtopic_id": "intro", "narration": "..", "visual": {{ "type": "equation", "content": ".." }}, "avatar_intent": {{"expression": "..", "gesture": ".."}} }}
-- {{ "kind": "check_in", "narration": "..", "options": [".."], "step": 5 }}
-
-VISUAL TYPES: "equation", "step_list" ({{"steps": []}}), "diagram" (DRAW_NUMBER_LINE, DRAW_COORDINATE_PLANE, DRAW_BOXES_AND_ARROWS: Label1, Label2, Label3, Description), "table", "none".
-""",
-            "public_speaking": """You are a Public Speaking Coach.
-Stay silent while the user speaks unless they stop for a long time.
-Provide feedback on pace, confidence, and clarity.
-Always return JSON with:
-{
-  "voice_text": "Brief spoken feedback to keep them inspired",
-  "visual_content": "Detailed bullet points of feedback for the user to read",
-  "avatar_intent": {"expression": "neutral/encouraging", "gesture": "listening/nodding"},
-  "pedagogical_state": "evaluating"
-}""",
-            "interview": """You are a Professional Interviewer.
-Ask role-specific questions. Be challenging but fair.
-Always return JSON with:
-{
-  "voice_text": "The next interview question or follow-up",
-  "visual_content": "Strengths/Improvements of their last answer. Use bullet points.",
-  "avatar_intent": {"expression": "neutral/skeptical", "gesture": "listening/thinking"},
-  "pedagogical_state": "evaluating"
-}""",
-        }
-
-        system_prompt = system_prompts.get(
-            mode,
-            "You are a helpful AI assistant. Return JSON with voice_text and visual_content.",
-        )
+        if mode == "tutoring":
+            system_prompt = _TUTORING_PROMPT_TEMPLATE.format(
+                current_step=current_step,
+                next_step=current_step + 1,
+            )
+        else:
+            system_prompt = _SYSTEM_PROMPTS.get(mode, _DEFAULT_SYSTEM_PROMPT)
 
         # Keep focused recent history so latest intent dominates.
         history_window = messages[-12:] if len(messages) > 12 else messages
 
-        history_str = ""
-        for msg in history_window[:-1]:
-            role = "AI" if msg.get("role") == "assistant" else "User"
-            history_str += f"{role}: {msg.get('content', '')}\n"
+        history_str = "".join(
+            f"{'AI' if msg.get('role') == 'assistant' else 'User'}: {msg.get('content', '')}\n"
+            for msg in history_window[:-1]
+        )
 
         user_message = history_window[-1].get("content", "Hello") if history_window else "Hello"
 
@@ -446,25 +830,35 @@ Always return JSON with:
             "Return ONLY raw JSON."
         )
 
-        safety_settings = [
-            {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
-        ]
-
+        cache_key = self._response_cache_key(mode, "low", full_prompt)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+        # Stream the reply and stop at the first complete top-level object that parses.
+        scanner = _JsonObjectScanner()
+        parsed: Optional[Dict[str, Any]] = None
+        stream = self._stream_with_fallback(
+            full_prompt,
+            thinking_level="low",
+            safety_settings=_SAFETY_SETTINGS,
+        )
         try:
-            response = await self._generate_with_fallback(
-                full_prompt,
-                thinking_level="low",
-                safety_settings=safety_settings,
-            )
-            text = getattr(response, "text", "") or ""
+            async for chunk in stream:
+                for candidate in scanner.feed(chunk):
+                    parsed = self._parse_response_json(candidate)
+                    if parsed:
+                        break
+                if parsed:
+                    break
+            text = scanner.buffer
 
-            parsed = self._parse_response_json(text)
+            if not parsed:
+                parsed = self._parse_response_json(text)
             if parsed:
                 if "type" not in parsed and "kind" not in parsed:
                     parsed["type"] = "coach_response"
+                self._store_response(cache_key, parsed)
                 return parsed
 
             return {
@@ -475,8 +869,10 @@ Always return JSON with:
                 "pedagogical_state": "explaining",
             }
         except Exception as e:
-            print(f"Gemini error: {e}")
+            logger.warning("Gemini error: %s", e)
             return self._fallback_response(mode, str(e))
+        finally:
+            await stream.aclose()
 
     async def generate_json_response(
         self,
@@ -488,22 +884,21 @@ Always return JSON with:
         if not self.api_key:
             return self._fallback_response(mode, "Gemini API key is missing or not loaded.")
 
-        safety_settings = [
-            {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
-        ]
+        cache_key = self._response_cache_key(mode, thinking_level, prompt)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
 
         try:
             response = await self._generate_with_fallback(
                 prompt,
                 thinking_level=thinking_level,
-                safety_settings=safety_settings,
+                safety_settings=_SAFETY_SETTINGS,
             )
             text = getattr(response, "text", "") or ""
             parsed = self._parse_response_json(text)
             if parsed:
+                self._store_response(cache_key, parsed)
                 return parsed
 
             return {
@@ -514,9 +909,41 @@ Always return JSON with:
                 "pedagogical_state": "explaining",
             }
         except Exception as e:
-            print(f"Gemini JSON error: {e}")
+            logger.warning("Gemini JSON error: %s", e)
             return self._fallback_response(mode, str(e))
 
+    async def generate_json_field(
+        self,
+        prompt: str,
+        field: str,
+        thinking_level: str = "low",
+    ) -> Optional[str]:
+        """Stream a JSON-only response and return one string field as soon as it is complete."""
+        if not self.api_key:
+            return None
+
+        buffer = ""
+        stream = self._stream_with_fallback(
+            prompt,
+            thinking_level=thinking_level,
+            safety_settings=_SAFETY_SETTINGS,
+        )
+        try:
+            async for text in stream:
+                buffer += text
+                value = self._read_json_string_field(buffer, field)
+                if value is not None:
+                    return value
+        except Exception as e:
+            logger.warning("Gemini JSON stream error: %s", e)
+            return None
+        finally:
+            await stream.aclose()
+
+        parsed = self._parse_response_json(buffer)
+        value = parsed.get(field) if parsed else None
+        return value if isinstance(value, str) else None
+
     def _fallback_response(self, mode: str, error_message: str) -> Dict[str, Any]:
         """Return a mode-appropriate fallback response instead of a hard error."""
         if mode == "tutoring":
@@ -571,6 +998,6 @@ Always return JSON with:
             parsed = self._parse_response_json(text)
             if parsed:
                 return parsed
-            return json.loads(text)
+            return _loads(text)
         except Exception:
             return {"filler_count": 0, "quality_score": 80}
@@ -1,16 +1,9 @@
+import sys
 
-import os
-import google.generativeai as genai
-from dotenv import load_dotenv
-
-load_dotenv()
-api_key = os.getenv("GEMINI_API_KEY")
+from models_utils import list_gemini_models
 
 try:
-    genai.configure(api_key=api_key)
     print("Full list of Gemini models:")
-    for m in genai.list_models():
-        if 'gemini' in m.name:
-            print(m.name)
+    sys.stdout.writelines(f"{name}\n" for name in list_gemini_models())
 except Exception as e:
     print(f"Error: {e}")
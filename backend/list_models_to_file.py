@@ -1,17 +1,7 @@
-
-import os
-import google.generativeai as genai
-from dotenv import load_dotenv
-
-load_dotenv()
-api_key = os.getenv("GEMINI_API_KEY")
+from models_utils import list_gemini_models
 
 try:
-    genai.configure(api_key=api_key)
-    with open('models_list.txt', 'w') as f:
-        for m in genai.list_models():
-            if 'gemini' in m.name:
-                f.write(f"{m.name}\n")
+    list_gemini_models("models_list.txt")
     print("Models written to models_list.txt")
 except Exception as e:
     print(f"Error: {e}")
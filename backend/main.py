@@ -10,20 +10,32 @@ os.environ["GLOG_minloglevel"] = "3"
 
 import json
 import asyncio
+import logging
 import uuid
+import weakref
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.websockets import WebSocketState
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from dotenv import load_dotenv
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
 
 # Import custom modules
 from gemini_client import GeminiClient
 from coaching_engine import CoachingEngine
 from session_manager import SessionManager
 
+# Module level rather than under __main__: with reload=True the app is imported in a
+# separate worker process. A no-op if the host already configured the root logger.
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s: %(message)s")
+logger = logging.getLogger(__name__)
+
 # Load environment variables
 load_dotenv()
 
@@ -44,8 +56,76 @@ gemini_client = GeminiClient(api_key=os.getenv("GEMINI_API_KEY"))
 session_manager = SessionManager()
 coaching_engine = CoachingEngine(gemini_client, session_manager)
 
+@app.on_event("shutdown")
+async def flush_sessions():
+    """Stop the write-behind loop and write out sessions still waiting on it."""
+    await session_manager.close()
+
+
+# Text turns a connection may queue behind an in-flight Gemini call before reads pause.
+_MAX_PENDING_TURNS = 8
+
+
+async def _run_turns(websocket: WebSocket, session_id: str, turns: "asyncio.Queue[Optional[tuple]]"):
+    """Answer queued text turns in order so slow Gemini calls never hold up the receive loop.
+
+    Stops at a None sentinel.
+    """
+    while True:
+        item = await turns.get()
+        if item is None:
+            turns.task_done()
+            return
+        message_type, text = item
+        try:
+            try:
+                response = await coaching_engine.process_text(
+                    session_id=session_id,
+                    text=text
+                )
+            except Exception as turn_error:
+                logger.exception("Message handling failed for type %r: %s", message_type, turn_error)
+                response = {
+                    "type": "error",
+                    "message": f"Failed to process '{message_type}' message"
+                }
+            # The client may have left while the turn ran; then there is no one to answer.
+            if websocket.client_state == WebSocketState.CONNECTED:
+                await _send_json(websocket, response)
+        except Exception as send_error:
+            logger.warning("Could not send %r reply for session %s: %s", message_type, session_id, send_error)
+        finally:
+            turns.task_done()
+
+
 # Active WebSocket connections
-active_connections: Dict[str, WebSocket] = {}
+# Weak so a handler that dies without reaching its finally does not pin the socket.
+active_connections: "weakref.WeakValueDictionary[str, WebSocket]" = weakref.WeakValueDictionary()
+
+
+def _loads(data: str) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _dumps(payload: Dict[str, Any]) -> str:
+    if orjson is None:
+        return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+async def _send_json(websocket: WebSocket, payload: Dict[str, Any]):
+    """Send a JSON text frame; the frontend JSON.parses event.data, so never binary."""
+    await websocket.send_text(_dumps(payload))
+
+
+# Fixed error frames, serialized once.
+_ERR_SESSION_NOT_FOUND = _dumps({"type": "error", "message": "Session not found"})
+_ERR_INVALID_JSON = _dumps({"type": "error", "message": "Invalid JSON payload"})
+_ERR_NOT_AN_OBJECT = _dumps({"type": "error", "message": "Invalid message payload: expected JSON object"})
+_ERR_MISSING_TYPE = _dumps({"type": "error", "message": "Invalid message payload: missing 'type'"})
+_ERR_EMPTY_TRANSCRIPT = _dumps({"type": "error", "message": "Empty transcript received"})
+_ERR_INVALID_BIOMETRIC = _dumps({"type": "error", "message": "Invalid biometric_data payload"})
+_ERR_EMPTY_TEXT = _dumps({"type": "error", "message": "Empty text payload received"})
 
 
 
@@ -140,52 +220,46 @@ async def coaching_websocket(websocket: WebSocket, session_id: str):
     """
     await websocket.accept()
     active_connections[session_id] = websocket
+    turns: "asyncio.Queue[Optional[tuple]]" = asyncio.Queue(maxsize=_MAX_PENDING_TURNS)
+    turn_worker: Optional[asyncio.Task] = None
+    pinned = False
     
     try:
         # Get or create session
         session = await session_manager.get_session(session_id)
         if not session:
-            await websocket.send_json({
-                "type": "error",
-                "message": "Session not found"
-            })
+            await websocket.send_text(_ERR_SESSION_NOT_FOUND)
             await websocket.close()
             return
+        session_manager.pin(session_id)
+        pinned = True
         
         # Send initial connection confirmation
-        await websocket.send_json({
+        await _send_json(websocket, {
             "type": "connected",
             "session_id": session_id,
             "mode": session["mode"]
         })
+        turn_worker = asyncio.create_task(_run_turns(websocket, session_id, turns))
         
         # Main message loop
         while True:
             # Receive message from frontend
             data = await websocket.receive_text()
             try:
-                message = json.loads(data)
+                message = _loads(data)
             except json.JSONDecodeError:
-                await websocket.send_json({
-                    "type": "error",
-                    "message": "Invalid JSON payload"
-                })
+                await websocket.send_text(_ERR_INVALID_JSON)
                 continue
 
             if not isinstance(message, dict):
-                await websocket.send_json({
-                    "type": "error",
-                    "message": "Invalid message payload: expected JSON object"
-                })
+                await websocket.send_text(_ERR_NOT_AN_OBJECT)
                 continue
             message_type = message.get("type")
-            print(f"Received WebSocket message: {message_type}")
+            logger.debug("Received WebSocket message: %s", message_type)
 
             if not message_type:
-                await websocket.send_json({
-                    "type": "error",
-                    "message": "Invalid message payload: missing 'type'"
-                })
+                await websocket.send_text(_ERR_MISSING_TYPE)
                 continue
 
             try:
@@ -194,16 +268,9 @@ async def coaching_websocket(websocket: WebSocket, session_id: str):
                     # Process speech/text through coaching engine
                     transcript = (message.get("transcript") or "").strip()
                     if not transcript:
-                        await websocket.send_json({
-                            "type": "error",
-                            "message": "Empty transcript received"
-                        })
+                        await websocket.send_text(_ERR_EMPTY_TRANSCRIPT)
                         continue
-                    response = await coaching_engine.process_text(
-                        session_id=session_id,
-                        text=transcript
-                    )
-                    await websocket.send_json(response)
+                    await turns.put((message_type, transcript))
                     
 
 
@@ -211,10 +278,7 @@ async def coaching_websocket(websocket: WebSocket, session_id: str):
                     # Process biometric data
                     biometric_payload = message.get("data", {})
                     if not isinstance(biometric_payload, dict):
-                        await websocket.send_json({
-                            "type": "error",
-                            "message": "Invalid biometric_data payload"
-                        })
+                        await websocket.send_text(_ERR_INVALID_BIOMETRIC)
                         continue
                     await coaching_engine.process_biometric(
                         session_id=session_id,
@@ -225,37 +289,31 @@ async def coaching_websocket(websocket: WebSocket, session_id: str):
                     # Process text message
                     payload_text = (message.get("payload") or "").strip()
                     if not payload_text:
-                        await websocket.send_json({
-                            "type": "error",
-                            "message": "Empty text payload received"
-                        })
+                        await websocket.send_text(_ERR_EMPTY_TEXT)
                         continue
-                    response = await coaching_engine.process_text(
-                        session_id=session_id,
-                        text=payload_text
-                    )
-                    await websocket.send_json(response)
+                    await turns.put((message_type, payload_text))
                     
 
 
                 elif message_type == "end_session":
-                    # End session and generate report
+                    # End session and generate report once queued turns are answered
+                    await turns.join()
                     await session_manager.end_session(session_id)
                     report = await coaching_engine.generate_vibe_report(session_id)
-                    await websocket.send_json({
+                    await _send_json(websocket, {
                         "type": "session_ended",
                         "report": report
                     })
                     break
                 else:
-                    await websocket.send_json({
+                    await _send_json(websocket, {
                         "type": "error",
                         "message": f"Unsupported message type: {message_type}"
                     })
             except Exception as message_error:
-                print(f"Message handling failed for type '{message_type}': {message_error}")
+                logger.exception("Message handling failed for type %r: %s", message_type, message_error)
                 try:
-                    await websocket.send_json({
+                    await _send_json(websocket, {
                         "type": "error",
                         "message": f"Failed to process '{message_type}' message"
                     })
@@ -263,19 +321,28 @@ async def coaching_websocket(websocket: WebSocket, session_id: str):
                     break
                 
     except WebSocketDisconnect:
-        print(f"Client disconnected from session {session_id}")
+        logger.info("Client disconnected from session %s", session_id)
     except Exception as e:
-        print(f"Error in WebSocket connection: {e}")
+        logger.exception("Error in WebSocket connection: %s", e)
         try:
-            await websocket.send_json({
+            await _send_json(websocket, {
                 "type": "error",
                 "message": str(e)
             })
         except Exception:
             pass
     finally:
-        if session_id in active_connections:
-            del active_connections[session_id]
+        if turn_worker is not None:
+            # Only the turn already in flight finishes. Queued ones are dropped unanswered,
+            # like frames the inline loop had not yet read when the client left.
+            while not turns.empty():
+                turns.get_nowait()
+                turns.task_done()
+            await turns.put(None)
+            await turn_worker
+        if pinned:
+            session_manager.unpin(session_id)
+        active_connections.pop(session_id, None)
         try:
             await websocket.close()
         except:
@@ -5,12 +5,22 @@ Campus landmarks, academic programs, and local references
 from typing import Dict, List, Optional
 import random
 
+_INTERVIEW_LOCATION = "Mizzou Career Center"
+_TUTORING_LOCATION = "Ellis Library study room"
+_CAMPUS_CONTEXT = "Mizzou campus environment"
+_DEFAULT_CONTEXT = "Professional coaching session at Mizzou"
+
+_HEADER_TEMPLATE = """
+Setting: {location}
+Institution: University of Missouri (Mizzou)
+Context: {context}
+"""
 
 class MizzouContext:
     """Mizzou-specific context for personalized coaching"""
     
     # Campus landmarks
-    LANDMARKS = [
+    LANDMARKS = (
         "Lafferre Hall",
         "The Columns",
         "Jesse Hall",
@@ -21,10 +31,10 @@ class MizzouContext:
         "Faurot Field",
         "Mizzou Arena",
         "Reactor Building"
-    ]
+    )
     
     # Academic programs
-    PROGRAMS = [
+    PROGRAMS = (
         "Computer Science",
         "Engineering",
         "Business Administration",
@@ -35,7 +45,7 @@ class MizzouContext:
         "Agriculture",
         "Education",
         "Arts and Science"
-    ]
+    )
     
     # Local references
     REFERENCES = {
@@ -65,28 +75,34 @@ class MizzouContext:
     def get_context_for_scenario(scenario_type: str) -> Dict[str, any]:
         """Get Mizzou context for specific scenario type"""
         if scenario_type == "interview":
+            background, known = random.choices(MizzouContext.PROGRAMS, k=2)
             return {
-                "location": "Mizzou Career Center",
-                "interviewer_background": f"Mizzou {random.choice(MizzouContext.PROGRAMS)} alumni",
+                "location": _INTERVIEW_LOCATION,
+                "interviewer_background": f"Mizzou {background} alumni",
                 "references": [
                     "your experience at Mizzou",
                     "campus involvement",
-                    f"knowledge of {random.choice(MizzouContext.PROGRAMS)}"
+                    f"knowledge of {known}"
                 ]
             }
         elif scenario_type == "presentation":
+            # One draw covers both picks: split it into a landmark index and a program index.
+            landmark_index, program_index = divmod(
+                random.randrange(len(MizzouContext.LANDMARKS) * len(MizzouContext.PROGRAMS)),
+                len(MizzouContext.PROGRAMS)
+            )
             return {
-                "location": random.choice(MizzouContext.LANDMARKS),
+                "location": MizzouContext.LANDMARKS[landmark_index],
                 "audience": "Mizzou students and faculty",
                 "topics": [
-                    f"Research in {random.choice(MizzouContext.PROGRAMS)}",
+                    f"Research in {MizzouContext.PROGRAMS[program_index]}",
                     "Campus innovation initiatives",
                     "Student organization updates"
                 ]
             }
         elif scenario_type == "tutoring":
-return {
-                "location": "Ellis Library study room",
+            return {
+                "location": _TUTORING_LOCATION,
                 "subject_context": f"{random.choice(MizzouContext.PROGRAMS)} coursework",
                 "examples": [
                     "Mizzou-specific case studies",
@@ -96,19 +112,17 @@ return {
         else:
             return {
                 "location": random.choice(MizzouContext.LANDMARKS),
-                "context": "Mizzou campus environment"
+                "context": _CAMPUS_CONTEXT
             }
             
     @staticmethod
     def inject_mizzou_references(prompt: str, scenario_type: str) -> str:
         """Inject Mizzou context into prompts"""
-        context = MizzouContext.get_context_for_scenario(scenario_type)
-        
-        mizzou_context = f"""
-Setting: {context.get('location', 'Mizzou campus')}
-Institution: University of Missouri (Mizzou)
-Context: {context.get('context', 'Professional coaching session at Mizzou')}
-"""
+        # Only the setting varies, and only over LANDMARKS, so every header is prebuilt.
+        mizzou_context = _FIXED_HEADERS.get(scenario_type)
+        if mizzou_context is None:
+            headers = _PRESENTATION_HEADERS if scenario_type == "presentation" else _CAMPUS_HEADERS
+            mizzou_context = random.choice(headers)
         
         return f"{mizzou_context}\n\n{prompt}"
         
@@ -138,3 +152,17 @@ Mood: Achievement, confidence, success
 The image should capture a peak moment of professional success at Mizzou."""
 
         return prompt
+
+
+_FIXED_HEADERS = {
+    "interview": _HEADER_TEMPLATE.format(location=_INTERVIEW_LOCATION, context=_DEFAULT_CONTEXT),
+    "tutoring": _HEADER_TEMPLATE.format(location=_TUTORING_LOCATION, context=_DEFAULT_CONTEXT),
+}
+_PRESENTATION_HEADERS = tuple(
+    _HEADER_TEMPLATE.format(location=landmark, context=_DEFAULT_CONTEXT)
+    for landmark in MizzouContext.LANDMARKS
+)
+_CAMPUS_HEADERS = tuple(
+    _HEADER_TEMPLATE.format(location=landmark, context=_CAMPUS_CONTEXT)
+    for landmark in MizzouContext.LANDMARKS
+)
@@ -0,0 +1,36 @@
+"""
+Gemini model listing shared by the helper scripts
+"""
+
+from typing import List
+import os
+import tempfile
+import time
+
+import google.generativeai as genai
+from dotenv import load_dotenv
+
+
+def list_gemini_models(cache_path: str = "models_list.txt", ttl: float = 3600) -> List[str]:
+    """Return Gemini model names, reusing cache_path while it is younger than ttl seconds."""
+    try:
+        if time.time() - os.path.getmtime(cache_path) < ttl:
+            with open(cache_path) as f:
+                return [line.strip() for line in f if line.strip()]
+    except OSError:
+        pass
+
+    load_dotenv()
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    names = [m.name for m in genai.list_models() if "gemini" in m.name]
+
+    # Write beside the target and rename so readers never see a half-written list.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.writelines(f"{name}\n" for name in names)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return names
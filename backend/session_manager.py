@@ -2,12 +2,52 @@
 Session Manager
 Handles session lifecycle, context compression, and data persistence
 """
-from typing import Dict, List, Optional
+from collections import Counter, OrderedDict, deque
+from itertools import islice
+from typing import Any, Dict, List, Optional, Set
+import base64
 import json
 import asyncio
-from datetime import datetime, timedelta
+import logging
+from datetime import datetime
 import uuid
 import os
+import time
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Seconds between write-behind flushes of sessions marked dirty.
+_FLUSH_INTERVAL_SECONDS = 2.0
+# Sessions kept in memory; the least recently used beyond this are written out and dropped.
+_MAX_ACTIVE_SESSIONS = 1024
+# Biometric readings kept per session; older frames drop off as new ones arrive.
+_BIOMETRIC_TIMELINE_LIMIT = 2048
+
+
+def confidence_score(frame: Dict) -> float:
+    """Higher is calmer: good posture and a low heart rate."""
+    return frame.get("posture_score", 0) - frame.get("heart_rate", 100) / 100
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, deque):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=_json_default, option=option)
+    return json.dumps(obj, indent=2 if indent else None, default=_json_default).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
 
 
 class SessionManager:
@@ -15,22 +55,42 @@ class SessionManager:
     
     def __init__(self, storage_path: str = "./sessions"):
         self.storage_path = storage_path
-        self.active_sessions: Dict[str, Dict] = {}
+        self.active_sessions: "OrderedDict[str, Dict]" = OrderedDict()
+        # Evicted sessions whose final save is still running; get_session takes them back.
+        self._evicting: Dict[str, Dict] = {}
+        self._created = 0
+        # Open WebSocket count per session; pinned sessions are never evicted.
+        self._pinned: Counter = Counter()
+        # Sessions with a compression in flight; a second one would cut stale indices.
+        self._compressing: Set[str] = set()
+        # Strong references: the loop only holds tasks weakly, and a collected
+        # eviction would lose that session's final save.
+        self._evict_tasks: Set[asyncio.Task] = set()
+        self._save_locks: Dict[str, asyncio.Lock] = {}
+        self._dirty: Set[str] = set()
+        # Appends since the last snapshot, written to {session_id}.jsonl on flush.
+        self._pending_log: Dict[str, List[Dict]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Created lazily so it binds to the serving loop, not the one at import time.
+        self._flush_lock: Optional[asyncio.Lock] = None
         os.makedirs(storage_path, exist_ok=True)
         self._cleanup_old_sessions()
         
     async def create_session(self, user_id: str, mode: str) -> Dict:
         """Create a new coaching session"""
-        session_id = str(uuid.uuid4())
+        # 22-char URL/filename-safe id instead of the 36-char hyphenated form.
+        session_id = base64.urlsafe_b64encode(uuid.uuid4().bytes).rstrip(b"=").decode("ascii")
         
         session = {
             "session_id": session_id,
             "user_id": user_id,
             "mode": mode,
             "start_time": datetime.now().isoformat(),
+            "start_epoch": time.time(),
             "end_time": None,
             "context_history": [],
-            "biometric_timeline": [],
+            "biometric_timeline": deque(maxlen=_BIOMETRIC_TIMELINE_LIMIT),
+            "biometric_stats": {"count": 0, "heart_rate_sum": 0.0, "high_stress_count": 0},
             "interactions": [],
             "biometric_baseline": None,
             "barge_in_sensitivity": 0.7,
@@ -44,6 +104,7 @@ class SessionManager:
                 "resume": "",
                 "started": False,
                 "start_time": None,
+                "start_epoch": None,
                 "question_count": 0,
                 "max_questions": 10,
                 "min_questions": 6,
@@ -52,7 +113,8 @@ class SessionManager:
                 "current_question": "",
                 "current_section": "",
                 "hint_used": False,
-                "last_question_time": None
+                "last_question_time": None,
+                "last_question_epoch": None
             },
             "public_speaking_state": {
                 "stage": "init",
@@ -61,7 +123,9 @@ class SessionManager:
                 "script": "",
                 "started": False,
                 "start_time": None,
+                "start_epoch": None,
                 "main_speech_start": None,
+                "main_speech_start_epoch": None,
                 "followup_index": 0,
                 "followup_total": 3,
                 "word_count": 0,
@@ -71,65 +135,95 @@ class SessionManager:
             }
         }
         
-        self.active_sessions[session_id] = session
+        self._remember(session_id, session)
         await self._save_session(session_id)
         
         # Trigger cleanup occasionally (every 10 sessions or so)
-        if len(self.active_sessions) % 5 == 0:
-            self._cleanup_old_sessions()
+        self._created += 1
+        if self._created % 5 == 0:
+            await asyncio.to_thread(self._cleanup_old_sessions)
         
         return session
         
     async def get_session(self, session_id: str) -> Optional[Dict]:
         """Get active session or load from storage"""
         if session_id in self.active_sessions:
+            self.active_sessions.move_to_end(session_id)
             return self.active_sessions[session_id]
+        if session_id in self._evicting:
+            session = self._evicting[session_id]
+            self._remember(session_id, session)
+            return session
             
         # Try to load from storage
         session_file = os.path.join(self.storage_path, f"{session_id}.json")
-        if os.path.exists(session_file):
-            with open(session_file, 'r') as f:
-                session = json.load(f)
+        data = await asyncio.to_thread(self._read_file, session_file)
+        if data is not None:
+            session = _loads(data)
                 
             # Check if session is still valid (within 24 hours)
-            start_time = datetime.fromisoformat(session["start_time"])
-            if datetime.now() - start_time < timedelta(hours=24):
-                self.active_sessions[session_id] = session
+            if self._session_age(session) < 24 * 3600:
+                session["biometric_timeline"] = deque(
+                    session.get("biometric_timeline", ()), maxlen=_BIOMETRIC_TIMELINE_LIMIT
+                )
+                log_data = await asyncio.to_thread(self._read_file, self._log_path(session_id))
+                if log_data:
+                    self._replay_log(session, log_data)
+                self._remember(session_id, session)
                 return session
                 
         return None
         
     async def end_session(self, session_id: str):
         """End a session and finalize data"""
-        if session_id not in self.active_sessions:
+        session = await self.get_session(session_id)
+        if not session:
             return
             
-        session = self.active_sessions[session_id]
         session["end_time"] = datetime.now().isoformat()
         
         # Calculate duration
-        start = datetime.fromisoformat(session["start_time"])
-        end = datetime.fromisoformat(session["end_time"])
-        session["duration"] = (end - start).total_seconds()
+        session["duration"] = self._session_age(session)
         
         # Apply context compression if needed
         if len(session["context_history"]) > 50:
             session = await self._compress_context(session)
             
+        self._dirty.discard(session_id)
         await self._save_session(session_id)
         
     async def add_interaction(self, session_id: str, interaction: Dict):
         """Add interaction to session history"""
-        if session_id not in self.active_sessions:
+        await self.add_interactions(session_id, [interaction])
+
+    async def add_interactions(self, session_id: str, interactions: List[Dict], save: bool = True):
+        """Add several interactions in order and mark the session for the next flush.
+
+        Pass save=False when the caller persists the session itself later in the turn.
+        """
+        session = await self.get_session(session_id)
+        if not session:
             return
             
-        session = self.active_sessions[session_id]
-        session["interactions"].append(interaction)
+        for interaction in interactions:
+            self._apply_interaction(session, interaction)
+            if save:
+                self._queue_log(session_id, "interaction", interaction)
         
+        # Auto-compress if session is getting long (>30 minutes of history)
+        if len(session["interactions"]) > 100:
+            session = await self._compress_context(session)
+            # Compression rewrites the interaction list, so the log cannot express it.
+            self.mark_dirty(session_id)
+
+    def _apply_interaction(self, session: Dict, interaction: Dict):
+        session["interactions"].append(interaction)
+        context_history = session["context_history"]
+
         # Add to context history (handle different formats)
         if "role" in interaction and "content" in interaction:
             # New direct format
-            session["context_history"].append({
+            context_history.append({
                 "role": interaction["role"],
                 "content": interaction["content"],
                 "visual_content": interaction.get("visual_content", ""),
@@ -138,57 +232,105 @@ class SessionManager:
         else:
             # Legacy format with user/assistant keys
             if "user" in interaction and interaction["user"]:
-                session["context_history"].append({
+                context_history.append({
                     "role": "user",
                     "content": interaction["user"],
                     "timestamp": interaction.get("timestamp", datetime.now().isoformat())
                 })
-            
+
             if "assistant" in interaction and interaction["assistant"]:
-                session["context_history"].append({
+                context_history.append({
                     "role": "assistant",
                     "content": interaction["assistant"],
                     "timestamp": interaction.get("timestamp", datetime.now().isoformat())
                 })
         
-        # Auto-compress if session is getting long (>30 minutes of history)
-        if len(session["interactions"]) > 100:
-            session = await self._compress_context(session)
-            
-        await self._save_session(session_id)
-        
+    async def update_session(self, session_id: str, fields: Dict):
+        """Set top-level session fields and record them in the append-only log."""
+        session = await self.get_session(session_id)
+        if not session:
+            return
+        session.update(fields)
+        self._queue_log(session_id, "update", fields)
+
     async def add_biometric_data(self, session_id: str, biometric_data: Dict):
         """Add biometric data point to timeline"""
-        if session_id not in self.active_sessions:
+        session = await self.get_session(session_id)
+        if not session:
             return
             
-        session = self.active_sessions[session_id]
         biometric_data["timestamp"] = datetime.now().isoformat()
-        session["biometric_timeline"].append(biometric_data)
+        self._apply_biometric(session, biometric_data)
+        self._queue_log(session_id, "biometric", biometric_data)
         
         # Set baseline if not set (use first 30 seconds of data)
         if not session["biometric_baseline"] and len(session["biometric_timeline"]) >= 10:
-            await self._calculate_baseline(session_id)
+            await self._calculate_baseline(session)
+            self.mark_dirty(session_id)
             
+    def _apply_biometric(self, session: Dict, biometric_data: Dict):
+        """Append a reading and fold it into the running stats and peak confidence."""
+        self._track_peak_confidence(session, biometric_data)
+        session["biometric_timeline"].append(biometric_data)
+        stats = session.get("biometric_stats")
+        if not stats:
+            return
+        stats["count"] += 1
+        heart_rate = biometric_data.get("heart_rate", 70)
+        if stats["heart_rate_sum"] is not None and isinstance(heart_rate, (int, float)):
+            stats["heart_rate_sum"] += heart_rate
+        else:
+            stats["heart_rate_sum"] = None
+        if biometric_data.get("stress_level") == "high":
+            stats["high_stress_count"] += 1
+
+    @staticmethod
+    def _track_peak_confidence(session: Dict, frame: Dict):
+        """Keep the best frame so far so the report does not rescan the whole timeline.
+
+        Runs from _apply_biometric, so replaying the log brings the peak up to date too.
+        """
+        if "peak_confidence_score" not in session:
+            # Sessions started before tracking existed: seed from what is already stored.
+            try:
+                peak = max(session["biometric_timeline"], key=confidence_score, default=None)
+            except TypeError:
+                return
+            if peak is not None:
+                session["peak_confidence_score"] = confidence_score(peak)
+                session["peak_confidence_frame"] = peak
+        try:
+            score = confidence_score(frame)
+        except TypeError:
+            return
+        best = session.get("peak_confidence_score")
+        if best is None or score > best:
+            session["peak_confidence_score"] = score
+            session["peak_confidence_frame"] = frame
+
     async def get_latest_biometric(self, session_id: str) -> Optional[Dict]:
         """Get most recent biometric data"""
-        if session_id not in self.active_sessions:
+        session = await self.get_session(session_id)
+        if not session:
             return None
             
-        session = self.active_sessions[session_id]
         if session["biometric_timeline"]:
             return session["biometric_timeline"][-1]
         return None
         
-    async def _calculate_baseline(self, session_id: str):
+    async def _calculate_baseline(self, session: Dict):
         """Calculate biometric baseline from initial measurements"""
-        session = self.active_sessions[session_id]
-        timeline = session["biometric_timeline"][:10]  # First 10 readings
+        timeline = list(islice(session["biometric_timeline"], 10))  # First 10 readings
         
         if not timeline:
             return
             
-        avg_hr = sum(b.get("heart_rate", 70) for b in timeline) / len(timeline)
+        stats = session.get("biometric_stats")
+        if stats and stats["count"] == len(timeline) and stats["heart_rate_sum"] is not None:
+            # The running sum covers exactly these readings.
+            avg_hr = stats["heart_rate_sum"] / stats["count"]
+        else:
+            avg_hr = sum(b.get("heart_rate", 70) for b in timeline) / len(timeline)
         
         session["biometric_baseline"] = {
             "resting_heart_rate": avg_hr,
@@ -207,63 +349,222 @@ class SessionManager:
         if len(interactions) <= 30:
             return session
             
-        # Keep recent interactions
-        recent = interactions[-20:]
-        
-        # Summarize older interactions (in practice, would use Gemini for this)
-        summary = {
-            "type": "context_summary",
-            "interaction_count": len(interactions) - 20,
-            "key_topics": self._extract_key_topics(interactions[:-20]),
-            "learning_objectives": session.get("learning_objectives", []),
-            "pedagogical_state": "compressed_context",
-            "timestamp": datetime.now().isoformat()
-        }
+        session_id = session["session_id"]
+        if session_id in self._compressing:
+            return session
+            
+        # Summarize older interactions off the event loop (in practice, would use Gemini for this)
+        cut = len(interactions) - 20
+        self._compressing.add(session_id)
+        try:
+            summary = await asyncio.to_thread(
+                self._summarize_interactions, interactions[:cut], session.get("learning_objectives", [])
+            )
+        finally:
+            self._compressing.discard(session_id)
         
-        # Update session
-        session["interactions"] = [summary] + recent
+        # Update session; keep the last 20 plus anything appended while summarizing
+        session["interactions"] = [summary] + session["interactions"][cut:]
         session["context_compressed"] = True
         session["compression_timestamp"] = datetime.now().isoformat()
         
         return session
         
+    def _summarize_interactions(self, older: List[Dict], learning_objectives: List) -> Dict:
+        return {
+            "type": "context_summary",
+            "interaction_count": len(older),
+            "key_topics": self._extract_key_topics(older),
+            "learning_objectives": learning_objectives,
+            "pedagogical_state": "compressed_context",
+            "timestamp": datetime.now().isoformat()
+        }
+
     def _extract_key_topics(self, interactions: List[Dict]) -> List[str]:
         """Extract key topics from interactions (simplified)"""
         # In production, would use Gemini to extract topics
-        topics = []
+        topics: Counter = Counter()
         for interaction in interactions:
             user_text = interaction.get("user", "")
             if len(user_text) > 10:
                 # Simple keyword extraction (would use NLP in production)
-                words = user_text.split()
+                words = user_text.split(maxsplit=1)
                 if words:
-                    topics.append(words[0])
-        return list(set(topics))[:5]
+                    topics[words[0]] += 1
+        return [topic for topic, _ in topics.most_common(5)]
         
-    async def _save_session(self, session_id: str):
+    @staticmethod
+    def _session_age(session: Dict) -> float:
+        """Seconds since the session started; ISO parse only for sessions saved without start_epoch."""
+        start_epoch = session.get("start_epoch")
+        if start_epoch is not None:
+            return time.time() - start_epoch
+        return (datetime.now() - datetime.fromisoformat(session["start_time"])).total_seconds()
+
+    def _remember(self, session_id: str, session: Dict):
+        """Insert as most recently used, evicting the coldest sessions past the cap."""
+        self.active_sessions[session_id] = session
+        self.active_sessions.move_to_end(session_id)
+        while len(self.active_sessions) > _MAX_ACTIVE_SESSIONS:
+            old_id = next((sid for sid in self.active_sessions if sid not in self._pinned), None)
+            if old_id is None:
+                break  # every cached session has a live connection
+            old_session = self.active_sessions.pop(old_id)
+            self._evicting[old_id] = old_session
+            task = asyncio.get_running_loop().create_task(self._evict(old_id, old_session))
+            self._evict_tasks.add(task)
+            task.add_done_callback(self._evict_tasks.discard)
+
+    def pin(self, session_id: str):
+        """Keep a session cached while a WebSocket is streaming into it."""
+        self._pinned[session_id] += 1
+
+    def unpin(self, session_id: str):
+        self._pinned[session_id] -= 1
+        if self._pinned[session_id] <= 0:
+            del self._pinned[session_id]
+
+    async def _evict(self, session_id: str, session: Dict):
+        try:
+            # Always snapshot: a flush may already have taken this id out of _dirty.
+            self._dirty.discard(session_id)
+            await self._save_session(session_id, session)
+        except Exception as e:
+            logger.exception("Error saving evicted session %s: %s", session_id, e)
+        finally:
+            if self._evicting.get(session_id) is session:
+                del self._evicting[session_id]
+
+    def mark_dirty(self, session_id: str):
+        """Queue a full snapshot of the session for the write-behind flush."""
+        self._dirty.add(session_id)
+        self._schedule_flush()
+
+    def _queue_log(self, session_id: str, kind: str, entry: Dict):
+        """Queue an append-only record; cheaper than a snapshot for interactions and biometrics."""
+        self._pending_log.setdefault(session_id, []).append({"kind": kind, "entry": entry})
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(_FLUSH_INTERVAL_SECONDS)
+            # Shielded so close() cannot cut a snapshot write in half.
+            await asyncio.shield(self.flush())
+
+    async def flush(self):
+        """Snapshot every dirty session, then append queued records for the rest."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            dirty, self._dirty = self._dirty, set()
+            for session_id in dirty:
+                try:
+                    await self._save_session(session_id)
+                except Exception as e:
+                    logger.exception("Error saving session %s: %s", session_id, e)
+            for session_id in list(self._pending_log):
+                try:
+                    await self._append_log(session_id)
+                except Exception as e:
+                    logger.exception("Error appending to session log %s: %s", session_id, e)
+
+    async def close(self):
+        """Stop the write-behind loop, then write out everything still pending."""
+        task, self._flush_task = self._flush_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._evict_tasks:
+            await asyncio.gather(*self._evict_tasks)
+        # Waits on the flush lock for any in-flight flush before the final one.
+        await self.flush()
+
+    def _log_path(self, session_id: str) -> str:
+        return os.path.join(self.storage_path, f"{session_id}.jsonl")
+
+    async def _append_log(self, session_id: str):
+        records = self._pending_log.pop(session_id, None)
+        if not records:
+            return
+        data = b"".join(_dumps(record) + b"\n" for record in records)
+        lock = self._save_locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            await asyncio.to_thread(self._append_file, self._log_path(session_id), data)
+
+    def _replay_log(self, session: Dict, data: bytes):
+        """Apply records appended after the snapshot was written."""
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = _loads(line)
+            except ValueError:
+                break  # torn final line from an interrupted write
+            if record.get("kind") == "interaction":
+                self._apply_interaction(session, record["entry"])
+            elif record.get("kind") == "biometric":
+                self._apply_biometric(session, record["entry"])
+            elif record.get("kind") == "update":
+                session.update(record["entry"])
+
+    async def _save_session(self, session_id: str, session: Optional[Dict] = None):
         """Persist session to disk"""
-        if session_id not in self.active_sessions:
+        if session is None:
+            session = self.active_sessions.get(session_id)
+        if session is None:
             return
             
-        session = self.active_sessions[session_id]
         session_file = os.path.join(self.storage_path, f"{session_id}.json")
-        
-        with open(session_file, 'w') as f:
-            json.dump(session, f, indent=2)
+
+        # Serialize on the loop so the session cannot change mid-dump; only the disk write
+        # moves to a thread. The per-session lock keeps overlapping saves in order.
+        data = _dumps(session, indent=True)
+        # The snapshot covers every queued record, and the log restarts empty after it.
+        self._pending_log.pop(session_id, None)
+        lock = self._save_locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            await asyncio.to_thread(self._write_snapshot, session_file, self._log_path(session_id), data)
+
+    @staticmethod
+    def _read_file(path: str) -> Optional[bytes]:
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write_snapshot(path: str, log_path: str, data: bytes):
+        with open(path, 'wb') as f:
+            f.write(data)
+        try:
+            os.remove(log_path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _append_file(path: str, data: bytes):
+        with open(path, 'ab') as f:
+            f.write(data)
 
     def _cleanup_old_sessions(self, max_age_hours: int = 24):
         """Delete session files older than max_age_hours"""
         try:
-            now = datetime.now()
+            cutoff = time.time() - max_age_hours * 3600
             count = 0
-            for filename in os.listdir(self.storage_path):
-                if filename.endswith(".json"):
-                    file_path = os.path.join(self.storage_path, filename)
-                    file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-                    if now - file_time > timedelta(hours=max_age_hours):
-                        os.remove(file_path)
+            with os.scandir(self.storage_path) as entries:
+                for entry in entries:
+                    if entry.name.endswith((".json", ".jsonl")) and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
                         count += 1
             if count > 0:
-                print(f"Cleaned up {count} old session files.")
+                logger.info("Cleaned up %d old session files.", count)
         except Exception as e:
-            print(f"Error during session cleanup: {e}")
+            logger.exception("Error during session cleanup: %s", e)
@@ -0,0 +1,64 @@
+from coaching_engine import _DONE_RE, _FILLER_RE, _YES_RE
+
+YES_CASES = [
+    # (lowered reply, is a readiness reply)
+    ("yes", True),
+    ("yes, let's go", True),
+    ("i'm ready", True),
+    ("ok", True),
+    ("okay sure", True),
+    ("let's start", True),
+    ("yesterday was busy", False),
+    ("already prepared", False),
+    ("token limits", False),
+    ("restart the timer", False),
+    ("no", False),
+]
+
+FILLER_CASES = [
+    # (transcript, filler words counted)
+    ("Um, I think, uh, it went well", 2),
+    ("It was LIKE, you know, basically fine", 3),
+    ("You  know what I literally mean", 2),
+    ("It is likely we unlike the album", 0),
+    ("Umbrellas and a huge plumber", 0),
+    ("", 0),
+]
+
+DONE_CASES = [
+    # (lowered speech, ends the speech)
+    ("i'm done", True),
+    ("and that's the end.", True),
+    ("thank you everyone", True),
+    ("thanks for listening", True),
+    ("i have finished", True),
+    ("see you this weekend", False),
+    ("i recommend the endpoint", False),
+    ("the ending was abandoned", False),
+    ("we are undone without donations", False),
+    ("thankful for it", False),
+]
+
+
+def test_yes_reply():
+    for reply, expected in YES_CASES:
+        assert (_YES_RE.search(reply) is not None) == expected, reply
+    print("SUCCESS: Readiness replies match whole words only.")
+
+
+def test_filler_count():
+    for transcript, expected in FILLER_CASES:
+        assert len(_FILLER_RE.findall(transcript)) == expected, transcript
+    print("SUCCESS: Filler words counted as whole words, any case.")
+
+
+def test_public_speaking_done():
+    for speech, expected in DONE_CASES:
+        assert (_DONE_RE.search(speech) is not None) == expected, speech
+    print("SUCCESS: End-of-speech phrases match whole words only.")
+
+
+if __name__ == "__main__":
+    test_yes_reply()
+    test_filler_count()
+    test_public_speaking_done()
@@ -0,0 +1,64 @@
+from gemini_client import GeminiClient, _JsonObjectScanner
+
+SCAN_CASES = [
+    # (text, expected balanced spans)
+    ('{"a": 1}', ['{"a": 1}']),
+    ('x {"a": {"b": 2}} y', ['{"a": {"b": 2}}', '{"b": 2}']),
+    ('{"a": "}"}', ['{"a": "}"}']),
+    ('{"a": "{ not a brace"}', ['{"a": "{ not a brace"}']),
+    ('{"a": "quote \\" and }"}', ['{"a": "quote \\" and }"}']),
+    ('{"a": 1} {"b": 2}', ['{"a": 1}', '{"b": 2}']),
+    ('no braces here', []),
+    ('} stray {', []),
+]
+
+CANDIDATE_CASES = [
+    # (reply, expected leading candidates in order)
+    ('```json\n{"a": 1}\n```', ['{"a": 1}', '```json\n{"a": 1}\n```']),
+    ('{"a": 1}', ['{"a": 1}']),
+    ('Sure:\n```\n{"b": 2}\n```', ['Sure:\n```\n{"b": 2}\n```', '{"b": 2}']),
+    ('Here you go: {"c": {"d": 3}}', ['Here you go: {"c": {"d": 3}}', '{"c": {"d": 3}}', '{"d": 3}']),
+]
+
+SCANNER_CASES = [
+    # (streamed chunks, objects completed after each chunk)
+    (['{"a": 1}'], [['{"a": 1}']]),
+    (['{"a": ', '1}'], [[], ['{"a": 1}']]),
+    (['```json\n{"q": "x', '}"}', '\n```'], [[], ['{"q": "x}"}'], []]),
+    (['{"a": "\\', '"}"}'], [[], ['{"a": "\\"}"}']]),
+    (['{"a": {"b": 2}', '}'], [[], ['{"a": {"b": 2}}']]),
+    (['{"a": 1}{"b"', ': 2}'], [['{"a": 1}'], ['{"b": 2}']]),
+    (['} stray {"c": 3}'], [['{"c": 3}']]),
+]
+
+
+def test_scan_json_objects():
+    for text, expected in SCAN_CASES:
+        spans = GeminiClient._scan_json_objects(text)
+        found = [text[start:end + 1] for start, end in spans]
+        assert found == expected, (text, found)
+    print("SUCCESS: Balanced spans found, braces inside strings ignored.")
+
+
+def test_extract_json_candidates_order():
+    client = GeminiClient(api_key="")
+    for reply, expected in CANDIDATE_CASES:
+        candidates = client._extract_json_candidates(reply)
+        assert candidates[:len(expected)] == expected, (reply, candidates)
+        assert client._parse_response_json(reply) is not None, reply
+    print("SUCCESS: JSON candidates ordered most-likely first.")
+
+
+def test_json_object_scanner():
+    for chunks, expected in SCANNER_CASES:
+        scanner = _JsonObjectScanner()
+        completed = [scanner.feed(chunk) for chunk in chunks]
+        assert completed == expected, (chunks, completed)
+        assert scanner.buffer == "".join(chunks)
+    print("SUCCESS: Streamed objects completed on the right chunk.")
+
+
+if __name__ == "__main__":
+    test_scan_json_objects()
+    test_extract_json_candidates_order()
+    test_json_object_scanner()